@@ -0,0 +1,126 @@
+"""
+Benchmark the running averages for 25k regions with 30-year windows,
+updated over a century, one region at a time and in batches; their warm-up
+from empty windows, against the old np.append buffer growth; and the memory
+footprint of each averager, with and without an AveragerPool.
+"""
+import numpy as np
+import pytest
+from conftest import scaled
+from impactcommon.math import averages
+
+REGIONS = scaled(25000)
+LENGTH = 30
+YEARS = 100
+
+SCALARS = [averages.MeanAverager, averages.IncrementalMeanAverager, averages.MedianAverager,
+           averages.BucketAverager, averages.BartlettAverager]
+BATCHES = [averages.BatchMeanAverager, averages.BatchMedianAverager, averages.BatchBucketAverager,
+           averages.BatchBartlettAverager]
+
+
+@pytest.fixture(scope='module')
+def series():
+    return np.random.RandomState(0).normal(20, 5, size=(REGIONS, LENGTH + YEARS))
+
+
+def update_each(cls, series, years):
+    avgs = [cls(list(row[:LENGTH]), LENGTH) for row in series]
+    for year in range(LENGTH, LENGTH + years):
+        for avg, row in zip(avgs, series):
+            avg.update(row[year])
+            avg.get()
+    return avgs
+
+
+def update_batch(cls, series, years):
+    avg = cls(series[:, :LENGTH], LENGTH)
+    for year in range(LENGTH, LENGTH + years):
+        avg.update(series[:, year])
+        avg.get()
+    return avg
+
+
+@pytest.mark.benchmark(group='averages: create and update, region-years')
+@pytest.mark.parametrize('cls', SCALARS, ids=lambda cls: cls.__name__)
+def test_update_each(measure, series, cls):
+    measure(update_each, cls, series, 1, items=REGIONS)
+
+
+def update_get(avgs, series, years):
+    for year in range(years):
+        for avg, row in zip(avgs, series):
+            avg.update(row[year])
+            avg.get()
+
+
+@pytest.mark.benchmark(group='averages: update and get, region-years')
+@pytest.mark.parametrize('cls', [averages.MeanAverager, averages.IncrementalMeanAverager],
+                         ids=lambda cls: cls.__name__)
+def test_update_get(measure, series, cls):
+    avgs = [cls(list(row[:LENGTH]), LENGTH) for row in series]
+    measure(update_get, avgs, series[:, LENGTH:], 10, items=REGIONS * 10)
+
+
+@pytest.mark.benchmark(group='averages: create and update, region-years')
+@pytest.mark.parametrize('cls', BATCHES, ids=lambda cls: cls.__name__)
+def test_update_batch(measure, series, cls):
+    measure(update_batch, cls, series, YEARS, items=REGIONS * YEARS)
+
+
+def append_warmup(count, length):
+    """The old MemoryAverager warm-up: grow each buffer by one value per update."""
+    buffers = []
+    for ii in range(count):
+        values = np.array([], dtype=np.float64)
+        for jj in range(length):
+            values = np.append(values, float(jj))
+        buffers.append(values)
+    return buffers
+
+
+def warmup(cls, count, length):
+    """Build averagers from empty lists and fill their windows, as at the start of a run."""
+    avgs = [cls([], length) for ii in range(count)]
+    for jj in range(length):
+        for avg in avgs:
+            avg.update(float(jj))
+    return avgs
+
+
+@pytest.mark.benchmark(group='averages: warm-up from empty, averager-years')
+@pytest.mark.parametrize('length', [15, LENGTH, 100])
+@pytest.mark.parametrize('cls', ['np.append', averages.MeanAverager, averages.MedianAverager,
+                                 averages.BucketAverager, averages.BartlettAverager],
+                         ids=lambda cls: getattr(cls, '__name__', cls))
+def test_warmup(measure, cls, length):
+    count = scaled(2000)
+    if cls == 'np.append':
+        measure(append_warmup, count, length, items=count * length)
+    else:
+        measure(warmup, cls, count, length, items=count * length)
+
+
+@pytest.mark.benchmark(group='averages: creation and footprint, averagers')
+@pytest.mark.parametrize('pooled', [False, True], ids=['unpooled', 'pooled'])
+@pytest.mark.parametrize('cls', [averages.MeanAverager, averages.MedianAverager, averages.BucketAverager,
+                                 averages.BartlettAverager], ids=lambda cls: cls.__name__)
+def test_footprint(benchmark, measure, cls, pooled):
+    if pooled and cls is averages.BucketAverager:
+        pytest.skip("BucketAverager keeps no buffer to pool")
+
+    initial = list(np.zeros(LENGTH))
+    def create():
+        if not pooled:
+            return [cls(initial, LENGTH) for ii in range(REGIONS)]
+        pool = averages.AveragerPool(REGIONS, LENGTH)
+        return pool, [pool.create(cls, initial, LENGTH) for ii in range(REGIONS)]
+    measure(create, items=REGIONS)
+    benchmark.extra_info['bytes_per_averager'] = benchmark.extra_info['peak_memory_mb'] * 2**20 / REGIONS
+
+
+@pytest.mark.benchmark(group='averages: translate, region-years')
+@pytest.mark.parametrize('cls', [averages.MeanAverager, averages.MedianAverager, averages.BucketAverager,
+                                 averages.BartlettAverager], ids=lambda cls: cls.__name__)
+def test_translate(measure, series, cls):
+    measure(averages.translate, cls, LENGTH, series, items=series.size)
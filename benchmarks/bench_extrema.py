@@ -0,0 +1,50 @@
+"""
+Benchmark 10^6 minimizations of spline and quartic response curves, batched,
+and a sample of them one curve at a time.
+"""
+import numpy as np
+import pytest
+from conftest import scaled
+from impactcommon.math import minmaxspline, minpoly
+
+CURVES = scaled(1000000)
+SAMPLE = scaled(10000) # for the one-at-a-time solvers
+CHUNK = 100000
+
+KNOTS = [-12, -7, 0, 10, 18, 23, 28, 33]
+SPLINE = np.array([-0.088404222535054311, 0.00044585141069226897, -0.0013680191382785048, 0.0015570001425749581,
+                   -0.00014956629970445078, -0.0036869690281538109, 0.011688014471165964])
+QUARTIC = np.array([0, -0.01, 0.003, -1e-4, 1e-6])
+
+
+def perturbed(coeffs, count):
+    return coeffs * (1 + np.random.RandomState(0).normal(scale=0.3, size=(count, len(coeffs))))
+
+
+def in_chunks(solve, coeffs):
+    "Apply solve to the coefficients, CHUNK rows at a time, to bound memory."
+    return np.concatenate([solve(coeffs[ii:ii + CHUNK]) for ii in range(0, len(coeffs), CHUNK)])
+
+
+@pytest.mark.benchmark(group='extrema: splines, curves')
+def test_findsplinemin_many(measure):
+    coeffs = perturbed(SPLINE, CURVES)
+    measure(in_chunks, lambda chunk: minmaxspline.findsplinemin_many(KNOTS, chunk, 10, 25), coeffs, items=CURVES, rounds=1)
+
+
+@pytest.mark.benchmark(group='extrema: splines, curves')
+def test_findsplinemin(measure):
+    coeffs = perturbed(SPLINE, SAMPLE)
+    measure(lambda: [minmaxspline.findsplinemin(KNOTS, row, 10, 25) for row in coeffs], items=SAMPLE, rounds=1)
+
+
+@pytest.mark.benchmark(group='extrema: quartics, curves')
+def test_findpolymin_many(measure):
+    coeffs = perturbed(QUARTIC, CURVES)
+    measure(in_chunks, lambda chunk: minpoly.findpolymin_many(chunk, 10, 30), coeffs, items=CURVES, rounds=1)
+
+
+@pytest.mark.benchmark(group='extrema: quartics, curves')
+def test_findpolymin(measure):
+    coeffs = perturbed(QUARTIC, SAMPLE)
+    measure(lambda: [minpoly.findpolymin(row, 10, 30) for row in coeffs], items=SAMPLE, rounds=1)
@@ -0,0 +1,53 @@
+"""
+Benchmark degree-day calculations on 10^7 daily temperatures, compiled,
+with NumPy (as when numba is unavailable), and with the interpolated
+integral table.
+"""
+import numpy as np
+import pytest
+from conftest import scaled
+from impactcommon.math import gddkdd, jit
+
+DAYS = scaled(10000000)
+REGIONS = 1000
+
+
+@pytest.fixture(scope='module')
+def temps():
+    rng = np.random.RandomState(0)
+    mins = rng.uniform(-10, 30, size=DAYS)
+    maxs = mins + rng.uniform(0, 15, size=DAYS)
+    return mins, maxs
+
+
+@pytest.fixture(params=['compiled', 'numpy'])
+def mode(request, monkeypatch):
+    if request.param == 'numpy':
+        monkeypatch.setattr(jit, '_available', False)
+    return request.param
+
+
+@pytest.mark.benchmark(group='gddkdd: get_gddkdd, days')
+def test_get_gddkdd(measure, temps, mode):
+    measure(gddkdd.get_gddkdd, temps[0], temps[1], 8., 29., items=DAYS)
+
+
+@pytest.mark.benchmark(group='gddkdd: get_gddkdd, days')
+@pytest.mark.parametrize('tolerance', [1e-4, 1e-6])
+def test_get_gddkdd_table(measure, temps, tolerance):
+    measure(gddkdd.get_gddkdd, temps[0], temps[1], 8., 29., tolerance=tolerance, items=DAYS)
+
+
+@pytest.mark.benchmark(group='gddkdd: 0-40C ladder, day-thresholds')
+def test_above_thresholds(measure, temps, mode):
+    thresholds = np.arange(41.)
+    mins, maxs = temps[0].reshape(-1, REGIONS), temps[1].reshape(-1, REGIONS)
+    measure(gddkdd.above_thresholds, mins, maxs, thresholds, axis=0, items=DAYS * len(thresholds), rounds=1)
+
+
+@pytest.mark.benchmark(group='gddkdd: by year, days')
+@pytest.mark.parametrize('workers', [1, 4])
+def test_get_gddkdd_by_year(measure, temps, workers):
+    mins, maxs = temps[0].reshape(-1, REGIONS), temps[1].reshape(-1, REGIONS)
+    years = 2000 + np.arange(mins.shape[0]) // 365
+    measure(gddkdd.get_gddkdd_by_year, mins, maxs, 8., 29., years=years, workers=workers, items=DAYS)
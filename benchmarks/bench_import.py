@@ -0,0 +1,22 @@
+"""
+Benchmark the import time of impactcommon.math modules, each in a fresh
+interpreter. Importing should not pull in numba, which is loaded only when
+a kernel is first called.
+"""
+import subprocess
+import sys
+import pytest
+
+MODULES = ['impactcommon.math.averages', 'impactcommon.math.gddkdd', 'impactcommon.math.cubicspline']
+
+SCRIPT = """
+import sys
+import {0}
+assert 'numba' not in sys.modules
+"""
+
+
+@pytest.mark.benchmark(group='import, modules')
+@pytest.mark.parametrize('module', ['numpy'] + MODULES)
+def test_import(measure, module):
+    measure(subprocess.check_call, [sys.executable, '-c', SCRIPT.format(module)], items=1, rounds=5)
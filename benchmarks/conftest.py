@@ -0,0 +1,40 @@
+"""
+Shared setup for the benchmark suite.
+
+Sizes are those of a full projection run, scaled by the BENCHMARK_SCALE
+environment variable (default 1) for quicker checks. Each benchmark records
+its throughput (items per second, from the mean time) and the peak memory
+traced during one further call in the saved results' extra_info.
+"""
+import os
+import tracemalloc
+import pytest
+
+SCALE = float(os.environ.get('BENCHMARK_SCALE', 1))
+
+
+def scaled(count):
+    "A benchmark size, scaled by BENCHMARK_SCALE."
+    return max(1, int(count * SCALE))
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Call as measure(func, *args, items=N, rounds=R, **kwargs) to benchmark
+    func over N items, recording throughput and peak memory.
+    """
+    def run(func, *args, items=1, rounds=3, **kwargs):
+        result = benchmark.pedantic(func, args, kwargs, rounds=rounds, iterations=1, warmup_rounds=1)
+
+        tracemalloc.start()
+        func(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        benchmark.extra_info['items'] = items
+        benchmark.extra_info['throughput'] = items / benchmark.stats.stats.mean
+        benchmark.extra_info['peak_memory_mb'] = peak / 2**20
+        return result
+
+    return run
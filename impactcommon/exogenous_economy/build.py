@@ -0,0 +1,127 @@
+"""
+Build a store of GDPpc timeseries for every region, year and (IAM, SSP)
+scenario, so that workers can serve them with StoredGDPpcProvider rather
+than recomputing them from the CSVs.
+
+Run as, for example,
+
+    python -m impactcommon.exogenous_economy.build gdppc.npy \\
+        --growth social/baselines/gdppc-growth.csv \\
+        --baseline social/baselines/gdppc-merged-nohier.csv \\
+        --nightlights social/baselines/nightlight_weight_normalized.csv \\
+        --use-sharedpath
+
+By default, the store covers every (model, scenario) pair in the growth
+file, and every hierid in the nightlights file along with every ISO; the
+global timeseries is always included.
+"""
+
+import argparse
+from warnings import warn
+import numpy as np
+import pandas as pd
+from impactlab_tools.utils import files
+from . import csvcache
+from .gdppc import HierarchicalGDPpcProvider
+from .store import GLOBAL_HIERID, ISO_PREFIX, get_iso_key, write_gdppc_store
+
+
+def build_gdppc_cube(df_baseline, df_growth, df_nightlights, scenarios=None, hierids=None, startyear=2010, stopyear=2100):
+    """
+    Compute the GDPpc timeseries of every region, for each scenario.
+
+    Parameters
+    ----------
+    df_baseline, df_growth, df_nightlights : pd.DataFrame
+        As for HierarchicalGDPpcProvider.
+    scenarios : sequence of (str, str), optional
+        (iam, ssp) pairs; by default, every (model, scenario) in df_growth.
+    hierids : sequence of str, optional
+        By default, every hierid in df_nightlights and every ISO. The
+        timeseries of their ISOs and of every ISO with data, for regions not
+        in the list, are added as get_iso_key(iso), and the global timeseries
+        as GLOBAL_HIERID.
+    startyear, stopyear : int, optional
+
+    Returns
+    -------
+    cube : np.ndarray
+        Of shape (len(scenarios), len(hierids), stopyear - startyear + 1).
+    failed : np.ndarray
+        Boolean, of shape (len(scenarios), len(hierids)): the regions whose
+        ISO lacks the growth rates to compute a series, which are NaN in cube.
+    scenarios : list of (str, str)
+    hierids : list of str
+        The labels of the rows of cube, including the added ones.
+    years : np.ndarray
+    """
+    if scenarios is None:
+        scenarios = sorted(set(zip(df_growth.model, df_growth.scenario)))
+    isos = set(df_baseline.iso) | set(df_growth.iso)
+    if hierids is None:
+        hierids = sorted(isos | set(df_nightlights.hierid))
+    hierids = [hierid for hierid in hierids if hierid != GLOBAL_HIERID and not hierid.startswith(ISO_PREFIX)]
+    # The global series is served by the provider as that of an unknown ISO
+    isos = sorted(isos | set(hierid[:3] for hierid in hierids)) + [GLOBAL_HIERID[:3]]
+    labels = hierids + [get_iso_key(iso) for iso in isos[:-1]] + [GLOBAL_HIERID]
+    years = np.arange(startyear, stopyear + 1)
+
+    cube = np.full((len(scenarios), len(labels), len(years)), np.nan)
+    failed = np.zeros((len(scenarios), len(labels)), dtype=bool)
+    for ii, (iam, ssp) in enumerate(scenarios):
+        provider = HierarchicalGDPpcProvider(iam, ssp, df_baseline, df_growth.copy(), df_nightlights,
+                                             startyear=startyear, stopyear=stopyear, eager=True)
+
+        # ISO rows are unscaled, as served for regions without nightlights ratios
+        failedisos = set()
+        for jj, iso in enumerate(isos):
+            try:
+                cube[ii, len(hierids) + jj] = provider.get_iso_timeseries(iso)
+            except ValueError:
+                failedisos.add(iso)
+                failed[ii, len(hierids) + jj] = True
+        if failedisos:
+            names = ['global' if iso == isos[-1] else iso for iso in sorted(failedisos)]
+            warn("No GDPpc series for %s, %s in %s" % (iam, ssp, ', '.join(names)))
+
+        failed[ii, :len(hierids)] = [hierid[:3] in failedisos for hierid in hierids]
+        computed = [hierid for hierid, fail in zip(hierids, failed[ii]) if not fail]
+        cube[ii, np.nonzero(~failed[ii, :len(hierids)])[0]] = provider.get_timeseries_many(computed)
+
+    return cube, failed, list(scenarios), labels, years
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a store of GDPpc timeseries for every region and scenario.")
+    parser.add_argument('path', help="output store: a directory for npy, a .nc or .zarr path otherwise")
+    parser.add_argument('--growth', required=True, help="GDPpc growth CSV")
+    parser.add_argument('--baseline', required=True, help="GDPpc baseline CSV")
+    parser.add_argument('--nightlights', required=True, help="nightlights ratio CSV")
+    parser.add_argument('--hierids', help="CSV with a hierid column of the regions to include")
+    parser.add_argument('--scenario', action='append', metavar='IAM:SSP', help="scenario to include (repeatable)")
+    parser.add_argument('--startyear', type=int, default=2010)
+    parser.add_argument('--stopyear', type=int, default=2100)
+    parser.add_argument('--format', choices=['npy', 'netcdf', 'zarr'], default='npy')
+    parser.add_argument('--use-sharedpath', action='store_true', help="interpret relative paths as shareddir paths")
+    args = parser.parse_args(argv)
+
+    paths = [args.growth, args.baseline, args.nightlights]
+    if args.use_sharedpath:
+        paths = [files.sharedpath(path) for path in paths]
+    df_growth, df_baseline, df_nightlights = [csvcache.read_csv(path) for path in paths]
+
+    hierids = None
+    if args.hierids:
+        hierids = pd.read_csv(args.hierids).hierid.values
+    scenarios = None
+    if args.scenario:
+        scenarios = [tuple(scenario.split(':')) for scenario in args.scenario]
+
+    cube, failed, scenarios, hierids, years = build_gdppc_cube(df_baseline, df_growth, df_nightlights, scenarios=scenarios,
+                                                               hierids=hierids, startyear=args.startyear, stopyear=args.stopyear)
+    write_gdppc_store(args.path, cube, failed, scenarios, hierids, years, format=args.format)
+    print("Wrote %d scenarios x %d rows x %d years to %s" % (len(scenarios), len(hierids), len(years), args.path))
+
+
+if __name__ == '__main__':
+    main()
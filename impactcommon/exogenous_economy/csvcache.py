@@ -0,0 +1,105 @@
+"""
+On-disk cache of parsed CSV files, so that processes reading the same
+inputs skip parsing them.
+
+Parsed DataFrames (with their metacsv metadata) are pickled into the cache
+directory, given by the IMPACTCOMMON_CSV_CACHE environment variable or
+~/.cache/impactcommon/csv by default; setting IMPACTCOMMON_CSV_CACHE to ""
+or "0" disables the cache.
+
+An entry is keyed by the source's resolved path, size and modification
+time, and the pandas and metacsv versions that parsed it, so any change to
+the source or the parsers invalidates it; older entries for the same source
+are removed when a new one is written. Sources that are not local files,
+such as URLs, are read without the cache. Entries are written to
+a temporary file and renamed into place, so concurrent writers never leave
+a partial entry, and readers see either a complete entry or none. Only
+point the cache at directories you trust, as entries are unpickled.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+import metacsv
+import pandas as pd
+
+# Pickles depend on the versions that created them
+PARSER_VERSIONS = "pandas%s-metacsv%s" % (pd.__version__, getattr(metacsv, '__version__', ''))
+
+
+def get_cache_dir():
+    """The cache directory, or None if the cache is disabled."""
+    cache_dir = os.environ.get('IMPACTCOMMON_CSV_CACHE')
+    if cache_dir is None:
+        return os.path.join(os.path.expanduser('~'), '.cache', 'impactcommon', 'csv')
+    if cache_dir in ('', '0'):
+        return None
+    return cache_dir
+
+
+def get_cache_key(path):
+    """
+    The (source, entry) names for path: the entry changes with the file's
+    size and modification time, and the parser versions. Raises OSError if
+    path is not a local file.
+    """
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    source = hashlib.sha1(path.encode('utf-8')).hexdigest()
+    return source, "%s-%d-%d-%s.pkl" % (source, stat.st_size, stat.st_mtime_ns, PARSER_VERSIONS)
+
+
+def read_csv(path_or_buffer, cache=True):
+    """
+    Read a CSV with metacsv.read_csv, through the cache if it is enabled
+    and path_or_buffer is a path.
+    """
+    cache_dir = get_cache_dir() if cache else None
+    if cache_dir is None or not isinstance(path_or_buffer, (str, os.PathLike)):
+        return metacsv.read_csv(path_or_buffer)
+
+    try:
+        source, entry = get_cache_key(path_or_buffer)
+    except OSError:
+        return metacsv.read_csv(path_or_buffer) # e.g. a URL
+
+    try:
+        with open(os.path.join(cache_dir, entry), 'rb') as fp:
+            return pickle.load(fp)
+    except Exception:
+        pass # missing, or unreadable and replaced below
+
+    df = metacsv.read_csv(path_or_buffer)
+    try:
+        unchanged = get_cache_key(path_or_buffer)[1] == entry
+    except OSError:
+        unchanged = False
+    if unchanged: # skip caching if the file changed, or was removed, while parsing
+        write_entry(cache_dir, source, entry, df)
+    return df
+
+
+def write_entry(cache_dir, source, entry, df):
+    """Atomically write df as the given entry, removing older entries for the same source."""
+    # The cache is only an optimization, so failing to write to it is not an error
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(dir=cache_dir, prefix=entry + '.', suffix='.tmp')
+    except OSError:
+        return
+
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            pickle.dump(df, fp, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmppath, os.path.join(cache_dir, entry))
+    except Exception:
+        os.remove(tmppath)
+        return
+
+    for name in os.listdir(cache_dir):
+        if name.startswith(source + '-') and name.endswith('.pkl') and name != entry:
+            try:
+                os.remove(os.path.join(cache_dir, name))
+            except OSError:
+                pass # removed by another process
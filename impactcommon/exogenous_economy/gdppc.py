@@ -4,11 +4,11 @@ import numpy as np
 import pandas as pd
 import metacsv
 from impactlab_tools.utils import files
-from . import provider
+from . import csvcache, provider
 
 
 def read_hierarchicalgdppcprovider(iam, ssp, growth_path_or_buffer, baseline_path_or_buffer, nightlights_path_or_buffer,
-                                   startyear=2010, stopyear=2100, use_sharedpath=False):
+                                   startyear=2010, stopyear=2100, use_sharedpath=False, eager=False, use_cache=True):
     """
     Read files on disk to create a HierarchicalGDPpcProvider instance
 
@@ -32,6 +32,11 @@ def read_hierarchicalgdppcprovider(iam, ssp, growth_path_or_buffer, baseline_pat
         Must be within 5 years of the largest "year"  in 'growth_path_or_buffer'.
     use_sharedpath : bool, optional
         Interpret paths without leading "/" as "shareddir" paths?
+    eager : bool, optional
+        Compute every ISO's timeseries on construction? See HierarchicalGDPpcProvider.
+    use_cache : bool, optional
+        Read the CSV files through the on-disk cache of parsed files, if it
+        is enabled? See impactcommon.exogenous_economy.csvcache.
 
     Returns
     -------
@@ -56,9 +61,9 @@ def read_hierarchicalgdppcprovider(iam, ssp, growth_path_or_buffer, baseline_pat
         growth_path_or_buffer = files.sharedpath(growth_path_or_buffer)
         nightlights_path_or_buffer = files.sharedpath(nightlights_path_or_buffer)
 
-    df = metacsv.read_csv(baseline_path_or_buffer)
-    df_growth = metacsv.read_csv(growth_path_or_buffer)
-    df_nightlights = metacsv.read_csv(nightlights_path_or_buffer)
+    df = csvcache.read_csv(baseline_path_or_buffer, cache=use_cache)
+    df_growth = csvcache.read_csv(growth_path_or_buffer, cache=use_cache)
+    df_nightlights = csvcache.read_csv(nightlights_path_or_buffer, cache=use_cache)
 
     return HierarchicalGDPpcProvider(
         iam=iam,
@@ -67,7 +72,8 @@ def read_hierarchicalgdppcprovider(iam, ssp, growth_path_or_buffer, baseline_pat
         df_growth=df_growth,
         df_nightlights=df_nightlights,
         startyear=startyear,
-        stopyear=stopyear
+        stopyear=stopyear,
+        eager=eager
     )
 
 
@@ -148,13 +154,18 @@ class HierarchicalGDPpcProvider(provider.BySpaceProvider):
         Year to draw baseline value from. Must be in 'df_baseline's "year" column.
     stopyear : int, optional
         Must be within 5 years of the largest "year"  in 'df_growth'.
+    eager : bool, optional
+        If True, compute the GDPpc timeseries of every ISO in the data on
+        construction, as rows of the `gdppcs` array, and serve
+        `get_iso_timeseries` from them. Otherwise, each ISO is computed
+        when first requested.
 
     See Also
     --------
     read_hierarchicalgdppcprovider : Read files on disk to create a HierarchicalGDPpcProvider instance.
     """
     
-    def __init__(self, iam, ssp, df_baseline, df_growth, df_nightlights, startyear=2010, stopyear=2100):
+    def __init__(self, iam, ssp, df_baseline, df_growth, df_nightlights, startyear=2010, stopyear=2100, eager=False):
         """iam and ssp should be as described in the files (e.g., iam = 'low', ssp = 'SSP3')"""
         super().__init__(iam, ssp, startyear)
         self.stopyear = stopyear
@@ -170,6 +181,68 @@ class HierarchicalGDPpcProvider(provider.BySpaceProvider):
         self.growth_global = df_growth.loc[(df_growth.scenario == ssp) & (df_growth.model == iam)].groupby(['year']).median()
 
         self.df_nightlights = df_nightlights
+        # Nightlight ratios by hierid, keeping the first of any repeated hierids
+        self.nightlights_ratios = dict(zip(df_nightlights.hierid.values[::-1], df_nightlights.gdppc_ratio.values[::-1]))
+
+        self.gdppcs = None
+        if eager:
+            self._compute_all_iso_timeseries()
+
+    def _compute_all_iso_timeseries(self):
+        """Fill `gdppcs` with the timeseries of every ISO, indexed by `iso_rows`,
+        with the global timeseries for ISOs without data as the last row."""
+        yearindexes = (np.arange(self.startyear + 1, self.stopyear + 1) - 1 - self.startyear) // 5
+        periods = len(yearindexes) and yearindexes[-1] + 1
+
+        # (isos, values) baselines and (isos, yearindexes, growths) rates, in order of priority
+        first = ~self.df_baseline_this.iso.duplicated().values # as for the lazy computation
+        baselinesources = [(self.df_baseline_this.iso.values[first], self.df_baseline_this.value.values[first]),
+                           (self.df_baseline_anyiam.index.values, self.df_baseline_anyiam.value.values)]
+        growthsources = [(self.df_growth_this.iso.values, self.df_growth_this.yearindex.values, self.df_growth_this.growth.values),
+                         (self.df_growth_anyiam.index.get_level_values('iso').values, self.df_growth_anyiam.yearindex.values,
+                          self.df_growth_anyiam.growth.values)]
+        isos = pd.Index(sorted(set().union(*[source[0] for source in baselinesources + growthsources])))
+
+        # Baseline GDPpc of each ISO, and the global baseline in the last row
+        baselines = np.full(len(isos) + 1, self.baseline_global.value)
+        found = np.zeros(len(isos) + 1, dtype=bool)
+        for sourceisos, values in baselinesources:
+            rows = isos.get_indexer(sourceisos)
+            baselines[rows] = np.where(found[rows], baselines[rows], values)
+            found[rows] = True
+
+        # Growth rates of each ISO, from the first source that has any for it
+        globalrates, globalcomplete = self._get_period_growthrates(self.growth_global, periods)
+        growthrates = np.tile(globalrates, (len(isos) + 1, 1))
+        complete = np.full(len(isos) + 1, globalcomplete)
+        found = np.zeros(len(isos) + 1, dtype=bool)
+        for sourceisos, yearindex, values in growthsources:
+            rows = isos.get_indexer(sourceisos)
+            yearindex = np.int_(yearindex)
+            using = np.zeros(len(isos) + 1, dtype=bool)
+            using[rows] = ~found[rows]
+
+            keep = using[rows] & (yearindex >= 0) & (yearindex < periods)
+            counts = np.zeros((len(isos) + 1, periods), dtype=int)
+            np.add.at(counts, (rows[keep], yearindex[keep]), 1)
+
+            growthrates[using] = np.nan
+            growthrates[rows[keep], yearindex[keep]] = values[keep]
+            complete[using] = np.all(counts[using] == 1, axis=1)
+            found |= using
+
+        self.iso_rows = {iso: row for row, iso in enumerate(isos)}
+        self.iso_complete = complete # otherwise, raise errors as in the lazy computation
+        self.gdppcs = np.cumprod(np.hstack([baselines[:, None], growthrates[:, yearindexes]]), axis=1)
+        self.gdppcs.setflags(write=False)
+
+    def _get_period_growthrates(self, df_growth, periods):
+        """Growth rates for each 5-year period, and whether there is exactly one for each."""
+        if len(df_growth) == 0:
+            return np.full(periods, np.nan), periods == 0
+
+        matches = np.int_(df_growth.yearindex.values) == np.arange(periods)[:, None]
+        return df_growth.growth.values[np.argmax(matches, axis=1)], np.all(matches.sum(axis=1) == 1)
 
     def _get_best_iso_available(self, iso, df_this, df_anyiam, df_global):
         """Get the highest priority data available: first data from the IAM, then from any IAM, then global."""
@@ -188,17 +261,38 @@ class HierarchicalGDPpcProvider(provider.BySpaceProvider):
         """Return an np.array of GDPpc for the given region."""
         
         iso_gdppcs = self.get_iso_timeseries(hierid[:3])
-        ratio = self.df_nightlights.loc[self.df_nightlights.hierid == hierid].gdppc_ratio
-        if len(ratio) == 0:
+        ratio = self.nightlights_ratios.get(hierid)
+        if ratio is None:
             return iso_gdppcs # Assume all combined
-        if np.isnan(ratio.values[0]) or ratio.values[0] == 0:
+        if np.isnan(ratio) or ratio == 0:
             return 0.8 * iso_gdppcs
         
-        return iso_gdppcs * ratio.values[0]
+        return iso_gdppcs * ratio
+
+    def get_timeseries_many(self, hierids):
+        """Return an (n_regions, n_years) np.array of GDPpc for the given regions."""
+        if len(hierids) == 0:
+            return np.empty((0, self.stopyear - self.startyear + 1))
+
+        ratios = np.array([self.nightlights_ratios.get(hierid, 1.) for hierid in hierids]) # 1: assume all combined
+        ratios[np.isnan(ratios) | (ratios == 0)] = 0.8
+
+        isos, rows = np.unique([hierid[:3] for hierid in hierids], return_inverse=True)
+        iso_gdppcs = np.stack([self.get_iso_timeseries(iso) for iso in isos])
+        return iso_gdppcs[rows] * ratios[:, None]
 
-    @lru_cache(maxsize=None)
     def get_iso_timeseries(self, iso):
         """Return an np.array of GDPpc for the given ISO country."""
+        if self.gdppcs is not None:
+            row = self.iso_rows.get(iso, -1)
+            if self.iso_complete[row]:
+                return self.gdppcs[row]
+
+        return self._compute_iso_timeseries(iso)
+
+    @lru_cache(maxsize=None)
+    def _compute_iso_timeseries(self, iso):
+        """Compute the GDPpc timeseries for the given ISO country."""
         # Select baseline GDPpc
         df_baseline = self._get_best_iso_available(
             iso,
@@ -218,15 +312,13 @@ class HierarchicalGDPpcProvider(provider.BySpaceProvider):
             self.growth_global
         )
 
-        # Calculate GDPpc as they grow in time
-        gdppcs = [baseline]
-        for year in range(self.startyear + 1, self.stopyear + 1):
-            yearindex = int((year - 1 - self.startyear) / 5) # Last year's growth
-            growthrate = df_growth.loc[df_growth.yearindex == yearindex].growth.values
-            new_gdppc = gdppcs[-1] * growthrate
-            gdppcs.append(new_gdppc.item())
+        # Calculate GDPpc as they grow in time, each year by last year's growth
+        yearindexes = (np.arange(self.startyear + 1, self.stopyear + 1) - 1 - self.startyear) // 5
+        growthrates, complete = self._get_period_growthrates(df_growth, len(yearindexes) and yearindexes[-1] + 1)
+        if not complete:
+            raise ValueError("Need exactly one growth rate per period for %s from %d to %d" % (iso, self.startyear, self.stopyear))
 
-        return np.array(gdppcs)
+        return np.cumprod(np.concatenate(([baseline], growthrates[yearindexes])))
 
 
 if __name__ == '__main__':
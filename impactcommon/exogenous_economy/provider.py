@@ -1,3 +1,5 @@
+import numpy as np
+
 class BySpaceProvider(object):
     def __init__(self, iam, ssp, startyear):
         self.iam = iam
@@ -10,6 +12,10 @@ class BySpaceProvider(object):
     def get_timeseries(self, region):
         raise NotImplementedError()
 
+    def get_timeseries_many(self, regions):
+        """Return the timeseries of each region, as rows of an np.array."""
+        return np.stack([self.get_timeseries(region) for region in regions])
+
 class BySpaceTimeProvider(object):
     def __init__(self, iam, ssp):
         self.iam = iam
@@ -0,0 +1,171 @@
+"""
+Stores of precomputed GDPpc timeseries, for every region, year and
+(IAM, SSP) scenario, as written by `python -m impactcommon.exogenous_economy.build`.
+
+The cube has dimensions (scenario, hierid, year), so that each region's
+timeseries is contiguous. Besides the regions' rows, it holds every
+ISO's timeseries, before any nightlights ratio, as get_iso_key(iso) rows, and the global timeseries as the GLOBAL_HIERID row. A (scenario, hierid) "failed" mask marks the series
+that could not be computed. Three formats are supported:
+ - "npy": a directory holding the cube as gdppc.npy, the mask as
+   failed.npy and their labels as index.json. The cube is memory-mapped,
+   so timeseries are served without reading or copying the rest of the file.
+ - "netcdf" or "zarr": a dataset with "gdppc" and "failed" variables,
+   written and read with xarray (zarr requires the zarr package). The
+   scenario is read into memory when a provider is created.
+"""
+
+import json
+import os
+import numpy as np
+from . import provider
+
+GLOBAL_HIERID = '__global__' # the row for ISOs without data of their own
+ISO_PREFIX = '__iso__'
+
+
+def get_iso_key(iso):
+    """The label of the row holding an ISO's timeseries, as for its unlisted regions."""
+    return ISO_PREFIX + iso
+
+
+def get_store_format(path):
+    """Guess the format of the store at path from its name."""
+    if os.path.isdir(path) and os.path.exists(os.path.join(path, 'index.json')):
+        return 'npy'
+    if path.rstrip('/').endswith('.zarr'):
+        return 'zarr'
+    return 'netcdf'
+
+
+def write_gdppc_store(path, cube, failed, scenarios, hierids, years, format='npy'):
+    """
+    Write a GDPpc cube to a store.
+
+    Parameters
+    ----------
+    path : str
+    cube : np.ndarray
+        GDPpc values, of shape (len(scenarios), len(hierids), len(years)).
+    failed : np.ndarray
+        Boolean, of shape (len(scenarios), len(hierids)): the series that
+        could not be computed.
+    scenarios : sequence of (str, str)
+        The (iam, ssp) of each scenario.
+    hierids : sequence of str
+    years : sequence of int
+    format : str, optional
+        One of "npy", "netcdf" or "zarr".
+    """
+    cube = np.asarray(cube, dtype=np.float64)
+    failed = np.asarray(failed, dtype=bool)
+    assert cube.shape == (len(scenarios), len(hierids), len(years))
+    assert failed.shape == cube.shape[:2]
+
+    if format == 'npy':
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'gdppc.npy'), cube)
+        np.save(os.path.join(path, 'failed.npy'), failed)
+        with open(os.path.join(path, 'index.json'), 'w') as fp:
+            json.dump(dict(scenarios=[list(scenario) for scenario in scenarios], hierids=list(hierids),
+                           years=[int(year) for year in years]), fp)
+        return
+
+    import xarray as xr
+    ds = xr.Dataset({'gdppc': (('scenario', 'hierid', 'year'), cube), 'failed': (('scenario', 'hierid'), failed)},
+                    coords={'model': ('scenario', [iam for iam, ssp in scenarios]),
+                            'ssp': ('scenario', [ssp for iam, ssp in scenarios]),
+                            'hierid': list(hierids), 'year': np.asarray(years)})
+    if format == 'netcdf':
+        ds.to_netcdf(path)
+    elif format == 'zarr':
+        ds.to_zarr(path, mode='w')
+    else:
+        raise ValueError("Unknown store format: %s" % format)
+
+
+def read_gdppc_store(path, iam, ssp):
+    """
+    Read one scenario from a GDPpc store.
+
+    Returns
+    -------
+    gdppcs : np.ndarray
+        Of shape (len(hierids), len(years)); a memory-mapped view for "npy" stores.
+    failed : np.ndarray
+        Boolean, of shape (len(hierids),).
+    hierids : list of str
+    years : np.ndarray
+    """
+    format = get_store_format(path)
+    if format == 'npy':
+        with open(os.path.join(path, 'index.json')) as fp:
+            index = json.load(fp)
+        scenarios = [tuple(scenario) for scenario in index['scenarios']]
+        if (iam, ssp) not in scenarios:
+            raise KeyError("Scenario %s, %s not in %s" % (iam, ssp, path))
+
+        scenario = scenarios.index((iam, ssp))
+        cube = np.load(os.path.join(path, 'gdppc.npy'), mmap_mode='r')
+        failed = np.load(os.path.join(path, 'failed.npy'))[scenario]
+        return cube[scenario], failed, index['hierids'], np.array(index['years'])
+
+    import xarray as xr
+    ds = xr.open_zarr(path) if format == 'zarr' else xr.open_dataset(path)
+    with ds:
+        matches = np.nonzero((ds.model.values == iam) & (ds.ssp.values == ssp))[0]
+        if len(matches) == 0:
+            raise KeyError("Scenario %s, %s not in %s" % (iam, ssp, path))
+        gdppcs = ds.gdppc[matches[0]].values
+        failed = ds.failed[matches[0]].values.astype(bool)
+        return gdppcs, failed, list(ds.hierid.values), ds.year.values
+
+
+class StoredGDPpcProvider(provider.BySpaceProvider):
+    """
+    Provider of GDP per capita (GDPpc) timeseries from a store written by
+    `python -m impactcommon.exogenous_economy.build`.
+
+    Timeseries are views into the store (read-only, and memory-mapped for
+    "npy" stores). As in HierarchicalGDPpcProvider, regions not in the
+    store are given their ISO's timeseries, or the global one if their ISO
+    is not in the store either, and series that could not be computed raise
+    a ValueError. Regions with a nightlights ratio must be in the store to
+    be scaled by it.
+
+    Parameters
+    ----------
+    path : str
+    iam : str
+    ssp : str
+
+    See Also
+    --------
+    HierarchicalGDPpcProvider : Provider of GDP per capita (GDPpc) timeseries, selecting "best" data source
+    """
+
+    def __init__(self, path, iam, ssp):
+        gdppcs, failed, hierids, years = read_gdppc_store(path, iam, ssp)
+        super().__init__(iam, ssp, int(years[0]))
+        self.stopyear = int(years[-1])
+
+        self.gdppcs = np.asarray(gdppcs) # a view, for memory-mapped stores
+        self.gdppcs.setflags(write=False)
+        self.failed = failed
+        self.hierid_rows = {hierid: row for row, hierid in enumerate(hierids)}
+        self.global_row = self.hierid_rows[GLOBAL_HIERID]
+
+    def _get_row(self, hierid):
+        row = self.hierid_rows.get(hierid)
+        if row is None:
+            row = self.hierid_rows.get(get_iso_key(hierid[:3]), self.global_row)
+        if self.failed[row]:
+            raise ValueError("No GDPpc series for %s in %s, %s" % (hierid, self.iam, self.ssp))
+        return row
+
+    def get_timeseries(self, hierid):
+        """Return an np.array of GDPpc for the given region."""
+        return self.gdppcs[self._get_row(hierid)]
+
+    def get_timeseries_many(self, hierids):
+        """Return an (n_regions, n_years) np.array of GDPpc for the given regions."""
+        return self.gdppcs[[self._get_row(hierid) for hierid in hierids]]
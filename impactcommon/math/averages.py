@@ -1,18 +1,104 @@
+import bisect
+import importlib
+import math
 import numpy as np
-from numba import njit
+from . import jit
+from .jit import njit
 
-@njit 
+@njit('float64(float64[::1])')
 def compiled_npmean(x):
     return np.mean(x).item()
 
-@njit 
+@njit('float64(float64[::1])')
 def compiled_npmedian(x):
     return np.median(x).item()
 
+## Compiled kernels for the averagers below, which can also be called from other numba code.
+## Optional write indexes are passed as -1 while the buffer is still filling.
+
+@njit('UniTuple(int64, 2)(float64[::1], int64, int64, float64)')
+def memory_update(values, curlen, write_index, value):
+    """Add `value` to the ring buffer `values`, returning the new (curlen, write_index)."""
+    if write_index >= 0:
+        values[write_index] = value
+        write_index = (write_index + 1) % len(values)
+    else:
+        values[curlen] = value
+        curlen += 1
+        if curlen == len(values):
+            write_index = 0
+    return curlen, write_index
+
+@njit('float64(float64[::1], int64)')
+def mean_get(values, curlen):
+    """Mean of the first `curlen` entries of a ring buffer."""
+    return np.mean(values[:curlen])
+
+@njit('float64(float64[::1], int64)')
+def median_get(values, curlen):
+    """Median of the first `curlen` entries of a ring buffer."""
+    return np.median(values[:curlen])
+
+@njit('float64(float64[:, ::1], float64[:, ::1], float64[::1], int64, int64)')
+def kernel_get(fillweights, ringweights, values, curlen, write_index):
+    """Kernel average of a ring buffer, using the weights from get_kernel_weights()."""
+    if write_index >= 0:
+        weights = ringweights[write_index]
+    else:
+        weights = fillweights[curlen]
+
+    return weighted_sum(weights, values)
+
+@njit('float64(float64[::1], float64[::1])')
+def weighted_sum(weights, values):
+    """Sum of `weights` times `values`, added in order."""
+    total = 0.
+    for ii in range(len(values)):
+        total += weights[ii] * values[ii]
+    return total
+
+@njit('float64[::1](float64[:, ::1], int64)')
+def batch_mean_get(values, curlen):
+    """mean_get of each row of a batch of ring buffers."""
+    result = np.empty(values.shape[0])
+    for ii in range(values.shape[0]):
+        result[ii] = mean_get(values[ii], curlen)
+    return result
+
+@njit('float64[::1](float64[::1], float64[:, ::1])')
+def batch_weighted_sum(weights, values):
+    """weighted_sum of each row of a batch of ring buffers."""
+    result = np.empty(values.shape[0])
+    for ii in range(values.shape[0]):
+        result[ii] = weighted_sum(weights, values[ii])
+    return result
+
+@njit('Tuple((float64, int64))(float64, int64, int64, float64)')
+def bucket_update(sumval, curlen, length, value):
+    """Add `value` to a bucket average, returning the new (sumval, curlen)."""
+    if curlen >= length:
+        sumval = (length - 1) * sumval / curlen + value
+        curlen = length
+    else:
+        sumval += value
+        curlen += 1
+    return sumval, curlen
+
+def get_ring_indexes(length, steps):
+    """
+    The index in a series of the value held in each slot of a MemoryAverager's
+    ring buffer, after each step of the series: an array of shape (steps, length),
+    negative where the slot is still empty.
+    """
+    times = np.arange(steps)[:, None]
+    return times - (times - np.arange(length)) % length
+
 class RunningStatistic(object):
     """
     General interface for an running summary statistic over N values.
     """
+    __slots__ = ('length',)
+
     def __init__(self, length):            
         self.length = length
 
@@ -24,47 +110,204 @@ class RunningStatistic(object):
         "Get the current value of the running summary statistic."
         raise NotImplementedError()
 
+    def get_state(self):
+        "Return the attributes needed to restore this statistic, by name."
+        state = {}
+        for klass in type(self).__mro__:
+            for name in getattr(klass, '__slots__', ()):
+                state[name] = getattr(self, name)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        "Construct a statistic from the attributes returned by get_state()."
+        self = cls.__new__(cls)
+        for name, value in state.items():
+            setattr(self, name, value)
+        return self
+
 class MemoryAverager(RunningStatistic):
     """
     Parent class for a running statistic that efficiently stores the previous N values for its computation.
+
+    The buffer is allocated at its full length up front; until it is full, only
+    the first `curlen` entries are in use. A preallocated `buffer` of that length,
+    such as a row of an AveragerPool, may be supplied instead.
     """
-    def __init__(self, values, length):
+    __slots__ = ('values', 'curlen', 'write_index')
+
+    def __init__(self, values, length, buffer=None):
         super(MemoryAverager, self).__init__(length)
 
+        if buffer is None:
+            self.values = np.zeros(length)
+        elif buffer.shape != (length,) or buffer.dtype != np.float64:
+            raise ValueError("Buffer must be a float64 array of length {0}".format(length))
+        else:
+            self.values = buffer
         if len(values) >= length:
-            self.values = np.array(values[-length:], dtype=np.float64)
+            self.values[:] = values[-length:]
+            self.curlen = length
             self.write_index = 0 # overwrite at this location next time
         else:
-            self.values = np.array(values, dtype=np.float64)
-            self.write_index = None # append next time
+            self.values[:len(values)] = values
+            self.curlen = len(values)
+            self.write_index = None # fill next time
 
     def update(self, value):
         if self.write_index is not None:
             self.values[self.write_index] = value
             self.write_index = (self.write_index + 1) % self.length
         else:
-            self.values = np.append(self.values, value) 
-            if len(self.values) == self.length:
+            self.values[self.curlen] = value
+            self.curlen += 1
+            if self.curlen == self.length:
                 self.write_index = 0
 
 class MeanAverager(MemoryAverager):
     """
     Simple mean running average.
     """
+    __slots__ = ()
+
+    def get(self):
+        return mean_get(self.values, self.curlen)
+
+    @classmethod
+    def translate_series(cls, length, data):
+        """Running means along the last axis of `data`, summing each window in
+        ring-buffer order as get() does, so that the results are identical and
+        non-finite values only affect the windows containing them."""
+        steps = data.shape[-1]
+        indexes = get_ring_indexes(length, steps)
+        if jit.available():
+            # As the compiled mean_get: a sequential sum over the filled slots. Slot i is filled from step i.
+            total = np.zeros(data.shape)
+            for slot in range(min(length, steps)):
+                total[..., slot:] += data[..., indexes[slot:, slot]]
+            return total / np.minimum(np.arange(1, steps + 1), length)
+
+        # As np.mean, with pairwise sums, which it only takes along contiguous rows
+        result = np.empty(data.shape)
+        for tt in range(min(length - 1, steps)):
+            result[..., tt] = np.mean(np.ascontiguousarray(data[..., :tt + 1]), axis=-1)
+        if steps >= length:
+            windows = np.ascontiguousarray(data[..., indexes[length - 1:]])
+            result[..., length - 1:] = np.mean(windows, axis=-1)
+        return result
+
+class IncrementalMeanAverager(MeanAverager):
+    """
+    Mean running average that keeps a running sum, so get() takes constant time.
+
+    The sum is adjusted as each value replaces the oldest one, and is recomputed
+    exactly every `resync` updates (by default, once per window) to bound
+    floating-point drift. With 30-year windows, update() and get() together
+    are only slightly faster than MeanAverager's.
+    """
+    __slots__ = ('resync', 'sumval', 'since_resync')
+
+    def __init__(self, values, length, resync=None, buffer=None):
+        super(IncrementalMeanAverager, self).__init__(values, length, buffer=buffer)
+        self.resync = length if resync is None else resync
+        self.sumval = sum(self.values[:self.curlen].tolist(), 0.)
+        self.since_resync = 0
+
+    def update(self, value):
+        # The ring buffer update of MemoryAverager, inlined, with Python floats for speed
+        value = float(value)
+        values = self.values
+        write_index = self.write_index
+        if write_index is not None:
+            sumval = self.sumval + (value - values.item(write_index))
+            values[write_index] = value
+            write_index += 1
+            self.write_index = 0 if write_index == self.length else write_index
+        else:
+            sumval = self.sumval + value
+            values[self.curlen] = value
+            self.curlen += 1
+            if self.curlen == self.length:
+                self.write_index = 0
+
+        self.sumval = sumval
+        self.since_resync += 1
+        if self.since_resync >= self.resync or not math.isfinite(sumval):
+            # Non-finite values do not cancel out, so recompute until they leave the window
+            self.sumval = sum(self.values[:self.curlen].tolist(), 0.) # in order, as mean_get
+            self.since_resync = 0
+
     def get(self):
-        return compiled_npmean(self.values)
+        return self.sumval / self.curlen
 
 class MedianAverager(MemoryAverager):
     """
     Simple median running average.
+
+    A sorted copy of the window is kept alongside the ring buffer, so each update
+    is a binary search and list insertion, and get() just reads the middle.
     """
+    __slots__ = ('sorted', 'nancount')
+
+    def __init__(self, values, length, buffer=None):
+        super(MedianAverager, self).__init__(values, length, buffer=buffer)
+        self.sorted = sorted(value for value in self.values[:self.curlen].tolist() if not math.isnan(value))
+        self.nancount = self.curlen - len(self.sorted) # any NaN makes the median NaN
+
+    def update(self, value):
+        value = float(value)
+        if self.write_index is not None:
+            oldest = float(self.values[self.write_index])
+            if math.isnan(oldest):
+                self.nancount -= 1
+            else:
+                del self.sorted[bisect.bisect_left(self.sorted, oldest)]
+
+        if math.isnan(value):
+            self.nancount += 1
+        else:
+            bisect.insort(self.sorted, value)
+
+        super(MedianAverager, self).update(value)
+
+    def get_state(self):
+        state = super(MedianAverager, self).get_state()
+        del state['sorted'], state['nancount'] # rebuilt from the values
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        self = super(MedianAverager, cls).from_state(state)
+        self.sorted = sorted(value for value in self.values[:self.curlen].tolist() if not math.isnan(value))
+        self.nancount = self.curlen - len(self.sorted)
+        return self
+
     def get(self):
-        return compiled_npmedian(self.values)
+        if self.nancount > 0 or len(self.sorted) == 0:
+            return np.nan
+
+        half = len(self.sorted) // 2
+        if len(self.sorted) % 2 == 1:
+            return self.sorted[half]
+        return (self.sorted[half - 1] + self.sorted[half]) / 2 # as computed by np.median
+
+    @classmethod
+    def translate_series(cls, length, data):
+        """Running medians along the last axis of `data`, over strided windows."""
+        result = np.empty(data.shape)
+        for tt in range(min(length - 1, data.shape[-1])):
+            result[..., tt] = np.median(data[..., :tt + 1], axis=-1)
+        if data.shape[-1] >= length:
+            windows = np.lib.stride_tricks.sliding_window_view(data, length, axis=-1)
+            result[..., length - 1:] = np.median(windows, axis=-1)
+        return result
 
 class BucketAverager(RunningStatistic):
     """
     Bucket average, equivalent to an exponential kernel or Bayesian update.
     """
+    __slots__ = ('sumval', 'curlen')
+
     def __init__(self, values, length):
         super(BucketAverager, self).__init__(length)
         self.sumval = float(sum(values))
@@ -84,27 +327,121 @@ class BucketAverager(RunningStatistic):
     def get(self):
         return self.sumval / self.curlen
 
+    @classmethod
+    def translate_series(cls, length, data):
+        """
+        Bucket averages along the last axis of `data`.
+
+        The recurrence is stepped in time but vectorized over all other axes,
+        which reproduces update() exactly.
+        """
+        result = np.empty(data.shape)
+        sumval = np.zeros(data.shape[:-1])
+        for tt in range(data.shape[-1]):
+            curlen = min(tt, length)
+            if curlen >= length:
+                sumval = (length - 1) * sumval / curlen + data[..., tt]
+            else:
+                sumval = sumval + data[..., tt]
+                curlen += 1
+            result[..., tt] = sumval / curlen
+        return result
+
+_kernel_weights = {} # kernel contents -> (kernel, fillweights, ringweights)
+_flipped_kernel_weights = {} # normalized, flipped kernel contents -> same
+
+def get_kernel_weights(kernel):
+    """
+    Return the normalized, flipped kernel used by KernelAverager, along with the
+    weights to dot against its buffer: `fillweights[n]` while the first n entries
+    are filled, and `ringweights[w]` once full, with write index w.
+
+    The arrays are computed once per distinct kernel, shared, and read-only.
+    """
+    kernel = np.asarray(kernel, dtype=np.float64)
+    key = kernel.tobytes()
+    if key not in _kernel_weights:
+        _kernel_weights[key] = get_flipped_kernel_weights(np.flipud(kernel / sum(kernel)))
+
+    return _kernel_weights[key]
+
+def get_flipped_kernel_weights(flipped):
+    """
+    As get_kernel_weights, but starting from an already normalized and flipped
+    kernel, such as the `kernel` attribute of a KernelAverager.
+    """
+    flipped = np.asarray(flipped, dtype=np.float64)
+    key = flipped.tobytes()
+    if key not in _flipped_kernel_weights:
+        length = len(flipped)
+        flipped = flipped.copy()
+
+        fillweights = np.zeros((length + 1, length))
+        fillweights[0] = np.nan # no values to average
+        for nn in range(1, length + 1):
+            fillweights[nn, :nn] = flipped[-nn:] / np.sum(flipped[-nn:])
+
+        # At write index w, values[:w] are the most recent and values[w:] the oldest
+        ringweights = np.array([np.roll(flipped, ww) for ww in range(length)])
+
+        for array in (flipped, fillweights, ringweights):
+            array.flags.writeable = False
+        _flipped_kernel_weights[key] = (flipped, fillweights, ringweights)
+
+    return _flipped_kernel_weights[key]
+
 class KernelAverager(MemoryAverager):
     """
     Parent class for kernel-baesd averages.
     """
-    def __init__(self, values, kernel):
-        super(KernelAverager, self).__init__(values, len(kernel))
-        self.kernel = np.flipud(np.array(kernel) / sum(kernel))
+    __slots__ = ('kernel', 'fillweights', 'ringweights')
+
+    def __init__(self, values, kernel, buffer=None):
+        super(KernelAverager, self).__init__(values, len(kernel), buffer=buffer)
+        self.kernel, self.fillweights, self.ringweights = get_kernel_weights(kernel)
+
+    def get_state(self):
+        state = super(KernelAverager, self).get_state()
+        del state['fillweights'], state['ringweights'] # shared, from the kernel
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        self = super(KernelAverager, cls).from_state(state)
+        self.kernel, self.fillweights, self.ringweights = get_flipped_kernel_weights(self.kernel)
+        return self
     
     def get(self):
-        if self.write_index is None or self.write_index == 0:
-            subkernel = self.kernel[-len(self.values):]
-            out = np.dot(subkernel, self.values) / np.sum(subkernel)
-        else:
-            recentkernel = self.kernel[-self.write_index:]
-            olderkernel = self.kernel[:-self.write_index]
-            out = np.dot(recentkernel, self.values[:self.write_index]) + np.dot(olderkernel, self.values[self.write_index:])
-        return out.item()
+        # As kernel_get, which is for numba code, but faster to call from Python
+        weights = self.fillweights[self.curlen] if self.write_index is None else self.ringweights[self.write_index]
+        if jit.available():
+            return weighted_sum(weights, self.values)
+        return float(np.dot(weights, self.values)) # much faster than weighted_sum's interpreted loop
+
+    @classmethod
+    def translate_series(cls, length, data):
+        """
+        Kernel averages along the last axis of `data`, summed one ring-buffer
+        slot at a time with the weights get() uses after each step, so that the
+        results are identical to it (without numba, get() uses np.dot, which
+        may differ in the last bits).
+        """
+        avg = cls([], length)
+        steps = data.shape[-1]
+        indexes = get_ring_indexes(avg.length, steps)
+        counts = np.arange(1, steps + 1)
+        weights = np.where((counts < avg.length)[:, None], avg.fillweights[np.minimum(counts, avg.length)],
+                           avg.ringweights[counts % avg.length])
+
+        # As weighted_sum; the empty slots while filling add zero, so are skipped. Slot i is filled from step i.
+        result = np.zeros(data.shape)
+        for slot in range(min(avg.length, steps)):
+            result[..., slot:] += weights[slot:, slot] * data[..., indexes[slot:, slot]]
+        return result
 
     def get_calculation(self):
         if self.write_index is None or self.write_index == 0:
-            subkernel = self.kernel[-len(self.values):]
+            subkernel = self.kernel[-self.curlen:]
             return ' + '.join(["{0} * {1}".format(subkernel[ii] / np.sum(subkernel), self.values[ii]) for ii in range(len(subkernel))])
         else:
             recentkernel = self.kernel[-self.write_index:]
@@ -116,17 +453,247 @@ class KernelMeanAverager(KernelAverager):
     """
     Kernel-based implementation of a simple running average.
     """
-    def __init__(self, values, length=5):
-        super(KernelMeanAverager, self).__init__(values, np.ones(length))
+    __slots__ = ()
+
+    def __init__(self, values, length=5, buffer=None):
+        super(KernelMeanAverager, self).__init__(values, np.ones(length), buffer=buffer)
 
 class BartlettAverager(KernelAverager):
     """
     Bartlett running average.
     """
+    __slots__ = ()
+
+    def __init__(self, values, length=5, buffer=None):
+        super(BartlettAverager, self).__init__(values, np.flipud(np.arange(length) + 1.), buffer=buffer)
+
+class BatchMemoryAverager(RunningStatistic):
+    """
+    Parent class for running statistics over many series at once, storing the previous N values
+    of every series as rows of a single (n_series, N) ring buffer.
+
+    All series are updated together, so they share one write index.
+    """
+    __slots__ = ('values', 'curlen', 'write_index')
+
+    def __init__(self, values, length):
+        super(BatchMemoryAverager, self).__init__(length)
+
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None] # one initial value per series
+        
+        self.values = np.zeros((values.shape[0], length))
+        if values.shape[1] >= length:
+            self.values[:] = values[:, values.shape[1] - length:]
+            self.curlen = length
+            self.write_index = 0 # overwrite at this location next time
+        else:
+            self.values[:, :values.shape[1]] = values
+            self.curlen = values.shape[1]
+            self.write_index = None # fill next time
+
+    def update(self, values):
+        "Add a new value to every series; `values` has one entry per series."
+        if self.write_index is not None:
+            self.values[:, self.write_index] = values
+            self.write_index = (self.write_index + 1) % self.length
+        else:
+            self.values[:, self.curlen] = values
+            self.curlen += 1
+            if self.curlen == self.length:
+                self.write_index = 0
+
+class BatchMeanAverager(BatchMemoryAverager):
+    """
+    Simple mean running average, over many series.
+    """
+    __slots__ = ()
+
+    def get(self):
+        # Summed as in MeanAverager, so that the results are identical
+        if jit.available():
+            return batch_mean_get(self.values, self.curlen)
+        return np.mean(self.values[:, :self.curlen], axis=1)
+
+class BatchMedianAverager(BatchMemoryAverager):
+    """
+    Simple median running average, over many series.
+    """
+    __slots__ = ()
+
+    def get(self):
+        return np.median(self.values[:, :self.curlen], axis=1)
+
+class BatchBucketAverager(RunningStatistic):
+    """
+    Bucket average, over many series.
+    """
+    __slots__ = ('sumval', 'curlen')
+
+    def __init__(self, values, length):
+        super(BatchBucketAverager, self).__init__(length)
+
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None] # one initial value per series
+
+        # Summed in order, as by sum() in BucketAverager
+        self.sumval = np.zeros(values.shape[0])
+        for col in range(values.shape[1]):
+            self.sumval += values[:, col]
+        self.curlen = values.shape[1]
+
+    def update(self, values):
+        if self.curlen >= self.length:
+            self.sumval = (self.length - 1) * self.sumval / self.curlen + values
+            if self.curlen > self.length:
+                self.curlen = self.length
+        else:
+            self.sumval = self.sumval + values
+            self.curlen += 1
+
+    def get(self):
+        return self.sumval / self.curlen
+
+class BatchKernelAverager(BatchMemoryAverager):
+    """
+    Parent class for kernel-based averages, over many series.
+    """
+    __slots__ = ('kernel', 'fillweights', 'ringweights')
+
+    def __init__(self, values, kernel):
+        super(BatchKernelAverager, self).__init__(values, len(kernel))
+        self.kernel, self.fillweights, self.ringweights = get_kernel_weights(kernel)
+
+    def get_state(self):
+        state = super(BatchKernelAverager, self).get_state()
+        del state['fillweights'], state['ringweights'] # shared, from the kernel
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        self = super(BatchKernelAverager, cls).from_state(state)
+        self.kernel, self.fillweights, self.ringweights = get_flipped_kernel_weights(self.kernel)
+        return self
+
+    def get(self):
+        weights = self.fillweights[self.curlen] if self.write_index is None else self.ringweights[self.write_index]
+        # Summed as in KernelAverager, so that the results are identical; without numba,
+        # both use np.dot, which may order the sums differently for a matrix
+        if jit.available():
+            return batch_weighted_sum(weights, self.values)
+        return np.dot(self.values, weights)
+
+class BatchKernelMeanAverager(BatchKernelAverager):
+    """
+    Kernel-based implementation of a simple running average, over many series.
+    """
+    __slots__ = ()
+
+    def __init__(self, values, length=5):
+        super(BatchKernelMeanAverager, self).__init__(values, np.ones(length))
+
+class BatchBartlettAverager(BatchKernelAverager):
+    """
+    Bartlett running average, over many series.
+    """
+    __slots__ = ()
+
     def __init__(self, values, length=5):
-        super(BartlettAverager, self).__init__(values, np.flipud(np.arange(length) + 1.))
+        super(BatchBartlettAverager, self).__init__(values, np.flipud(np.arange(length) + 1.))
+
+class AveragerPool(object):
+    """
+    Contiguous storage for the ring buffers of many MemoryAveragers of the same
+    length: each averager created by the pool keeps its values in one row of
+    `self.values`.
+    """
+    def __init__(self, size, length):
+        self.values = np.zeros((size, length))
+        self.used = 0
+
+    def create(self, cls, values, *args, **kwargs):
+        """Construct cls(values, *args, **kwargs) on the next free row of the pool."""
+        if self.used == len(self.values):
+            raise ValueError("All {0} buffers in the pool are in use".format(len(self.values)))
+
+        avg = cls(values, *args, buffer=self.values[self.used], **kwargs)
+        self.used += 1
+        return avg
+
+def save_averagers(file, averagers):
+    """
+    Save the state of a collection of averagers to an uncompressed .npz file.
+
+    Averagers of the same class and shapes are stored together, with each
+    attribute from get_state() stacked into one array. A write_index of None
+    is stored as -1.
+    """
+    groups = {} # (class, attribute shapes) -> indexes into averagers
+    states = [avg.get_state() for avg in averagers]
+    for ii, (avg, state) in enumerate(zip(averagers, states)):
+        key = (type(avg), tuple((name, np.shape(value)) for name, value in state.items()))
+        groups.setdefault(key, []).append(ii)
+
+    arrays = dict(count=len(averagers), groups=len(groups))
+    for gg, ((cls, shapes), indexes) in enumerate(groups.items()):
+        prefix = 'group{0}/'.format(gg)
+        arrays[prefix + 'class'] = cls.__module__ + ':' + cls.__qualname__
+        arrays[prefix + 'index'] = np.array(indexes)
+        arrays[prefix + 'names'] = np.array([name for name, shape in shapes])
+        for name, shape in shapes:
+            column = [states[ii][name] for ii in indexes]
+            if name == 'write_index':
+                column = [-1 if value is None else value for value in column]
+            arrays[prefix + name] = np.array(column)
+
+    np.savez(file, **arrays)
+
+def load_averagers(file):
+    """
+    Restore the averagers saved by save_averagers, in the same order.
+
+    Each group is read as one block, and the buffers of the restored
+    averagers are views into it, as with an AveragerPool.
+    """
+    with np.load(file) as data:
+        averagers = [None] * int(data['count'])
+        for gg in range(int(data['groups'])):
+            prefix = 'group{0}/'.format(gg)
+            modname, qualname = str(data[prefix + 'class']).split(':')
+            cls = importlib.import_module(modname)
+            for attr in qualname.split('.'):
+                cls = getattr(cls, attr)
+
+            columns = {name: data[prefix + name] for name in data[prefix + 'names']}
+            for jj, ii in enumerate(data[prefix + 'index']):
+                state = {}
+                for name, column in columns.items():
+                    value = column[jj]
+                    state[name] = value.item() if np.ndim(value) == 0 else value
+                if state.get('write_index', None) == -1:
+                    state['write_index'] = None
+                averagers[ii] = cls.from_state(state)
+
+    return averagers
 
 def translate(cls, length, data):
+    """
+    Apply a running statistic to a whole series, returning the value of get()
+    after each datum is added.
+
+    If `cls` provides a vectorized `translate_series`, `data` may also be an array
+    of shape (..., years), with a series along the last axis; a list is returned
+    for 1-D inputs and an array of the same shape otherwise.
+    """
+    if hasattr(cls, 'translate_series'):
+        data = np.asarray(data, dtype=np.float64)
+        result = cls.translate_series(length, data)
+        if data.ndim == 1:
+            return result.tolist()
+        return result
+
     avg = cls([], length)
     result = []
     for datum in data:
@@ -136,7 +703,7 @@ def translate(cls, length, data):
     return result
 
 if __name__ == '__main__':
-    for cls in [MeanAverager, MedianAverager, BucketAverager, KernelMeanAverager, BartlettAverager]:
+    for cls in [MeanAverager, IncrementalMeanAverager, MedianAverager, BucketAverager, KernelMeanAverager, BartlettAverager]:
         print(cls)
         avg = cls([0, 1, 2, 3], 5)
         print(avg.get(), (0 + 1 + 2 + 3) / 4.)
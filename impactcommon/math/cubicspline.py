@@ -0,0 +1,71 @@
+"""Restricted cubic splines, evaluated with the same basis as openest's
+CubicSplineCurve: for knots k_1 .. k_K and coefficients c_0 .. c_{K-2},
+
+    f(x) = c_0 x + sum_j c_j [(x - k_j)+^3
+                              - (x - k_{K-1})+^3 (k_K - k_j) / (k_K - k_{K-1})
+                              + (x - k_K)+^3 (k_{K-1} - k_j) / (k_K - k_{K-1})]
+
+where (u)+ = max(0, u), and the terms are summed in order.
+"""
+
+import numpy as np
+from .jit import njit
+
+def spline(knots, coeffs, xx):
+    """Evaluate the spline with the given knots and coefficients at each of
+xx (a number or an array)."""
+    values = np.empty(np.shape(xx))
+    evaluate_spline(np.asarray(knots, dtype=np.float64), np.asarray(coeffs, dtype=np.float64),
+                    np.ravel(np.asarray(xx, dtype=np.float64)), values.reshape(-1))
+    return values if values.ndim else values.item()
+
+def derivative(knots, coeffs, xx):
+    """Evaluate the derivative of the spline at each of xx, as in spline."""
+    values = np.empty(np.shape(xx))
+    evaluate_derivative(np.asarray(knots, dtype=np.float64), np.asarray(coeffs, dtype=np.float64),
+                        np.ravel(np.asarray(xx, dtype=np.float64)), values.reshape(-1))
+    return values if values.ndim else values.item()
+
+@njit('float64(float64[::1], float64[::1], float64)')
+def spline_at(knots, coeffs, x):
+    """Value of the spline at a single point."""
+    value = coeffs[0] * x
+    scale = knots[-1] - knots[-2]
+    for kk in range(len(knots) - 2):
+        termk = max(0., x - knots[kk])
+        termKm1 = max(0., x - knots[-2])
+        termK = max(0., x - knots[-1])
+        value += (termk * termk * termk - termKm1 * termKm1 * termKm1 * (knots[-1] - knots[kk]) / scale + termK * termK * termK * (knots[-2] - knots[kk]) / scale) * coeffs[kk+1]
+    return value
+
+@njit('float64(float64[::1], float64[::1], float64)')
+def derivative_at(knots, coeffs, x):
+    """Derivative of the spline at a single point."""
+    value = coeffs[0]
+    scale = knots[-1] - knots[-2]
+    for kk in range(len(knots) - 2):
+        termk = max(0., x - knots[kk])
+        termKm1 = max(0., x - knots[-2])
+        termK = max(0., x - knots[-1])
+        value += 3 * (termk * termk - termKm1 * termKm1 * (knots[-1] - knots[kk]) / scale + termK * termK * (knots[-2] - knots[kk]) / scale) * coeffs[kk+1]
+    return value
+
+@njit('void(float64[::1], float64[::1], float64[::1], float64[::1])')
+def evaluate_spline(knots, coeffs, xx, values):
+    """Fill values with the spline at each of xx."""
+    for ii in range(len(xx)):
+        values[ii] = spline_at(knots, coeffs, xx[ii])
+
+@njit('void(float64[::1], float64[::1], float64[::1], float64[::1])')
+def evaluate_derivative(knots, coeffs, xx, values):
+    """Fill values with the derivative of the spline at each of xx."""
+    for ii in range(len(xx)):
+        values[ii] = derivative_at(knots, coeffs, xx[ii])
+
+@njit('void(float64[::1], float64[:, ::1], float64[:, ::1], float64[:, ::1])')
+def evaluate_splines(knots, coeffs, xx, values):
+    """Fill values with the spline for each row of coeffs, at the points
+in the same row of xx."""
+    for ii in range(xx.shape[0]):
+        for jj in range(xx.shape[1]):
+            values[ii, jj] = spline_at(knots, coeffs[ii], xx[ii, jj])
@@ -0,0 +1,70 @@
+"""
+Opt-in memoization of the curve extremum solvers, such as findsplinemin and
+findpolymin.
+
+Runs that hold covariates fixed ask for the extrema of the same curves again
+and again; wrapping a solver in an ExtremumCache returns those from a bounded
+least-recently-used cache instead. For example,
+
+    findsplinemin = ExtremumCache(minmaxspline.findsplinemin, tolerance=1e-12)
+    ...
+    print(findsplinemin.stats())
+
+Array arguments (knots, coefficients) are keyed by their contents, rounded to
+multiples of `tolerance` if one is given; scalar arguments (minx, maxx) are
+keyed exactly. With a tolerance, a cache hit returns the result for the first
+set of coefficients that rounded to the same key.
+"""
+
+from collections import OrderedDict
+import numpy as np
+
+
+class ExtremumCache(object):
+    """
+    Bounded LRU cache around a solver called as solver(*args), keeping up to
+    `maxsize` results and counting hits and misses.
+    """
+    def __init__(self, solver, maxsize=1024, tolerance=None):
+        self.solver = solver
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, arg):
+        "The part of the cache key for one argument."
+        if np.ndim(arg) == 0:
+            return float(arg)
+
+        values = np.asarray(arg, dtype=np.float64)
+        if self.tolerance is not None:
+            values = np.round(values / self.tolerance)
+        return (values.shape, values.tobytes())
+
+    def __call__(self, *args):
+        key = tuple(self.key(arg) for arg in args)
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+
+        self.misses += 1
+        result = self.solver(*args)
+        self.results[key] = result
+        if len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+        return result
+
+    def stats(self):
+        "Hits, misses, the hit rate, and the current number of entries."
+        calls = self.hits + self.misses
+        return dict(hits=self.hits, misses=self.misses, hitrate=self.hits / calls if calls else np.nan,
+                    size=len(self.results), maxsize=self.maxsize)
+
+    def clear(self):
+        "Empty the cache and reset the statistics."
+        self.results.clear()
+        self.hits = 0
+        self.misses = 0
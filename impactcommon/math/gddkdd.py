@@ -1,46 +1,366 @@
-import numpy as np
-import warnings
+"""Degree-day calculations, using a sinusoidal approximation of each
+day's temperature between its minimum and maximum.
+
+Missing values and degenerate days are handled as follows, in both the
+compiled and NumPy implementations:
+ - A day with a NaN minimum or maximum has NaN degree-days, so any sum
+   including it is NaN. Drop or fill missing days first if needed.
+ - A day with mins == maxs is either entirely above the threshold,
+   contributing mins - threshold, or not, contributing 0; no division
+   by the zero half-range is performed.
+ - A day with maxs <= threshold contributes 0, and one with
+   mins >= threshold contributes its mean less the threshold.
+"""
 
-warnings.simplefilter("ignore", RuntimeWarning)
+import math
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from . import jit
+from .jit import njit
 
-def above_threshold(mins, maxs, threshold):
+def above_threshold(mins, maxs, threshold, tolerance=None):
     """Use a sinusoidal approximation to estimate the number of Growing
 Degree-Days above a given threshold, using daily minimum and maximum
 temperatures.
 
-mins and maxs are numpy arrays; threshold is in the same units."""
+mins and maxs are numpy arrays; threshold is in the same units. If
+tolerance is given, the integral is interpolated from a table, to
+within tolerance times each day's half-range (see get_integral_table)."""
+
+    return above_thresholds(mins, maxs, [threshold], tolerance=tolerance)[0]
+
+def above_thresholds(mins, maxs, thresholds, axis=None, tolerance=None):
+    """Estimate the Growing Degree-Days above each of several thresholds,
+as in above_threshold, summing over the given axis (or all axes, if
+None).
+
+mins and maxs are numpy arrays of the same shape, e.g. (day, region)
+or (day, lat, lon); thresholds is a sequence in the same units.
+Returns an array of shape (len(thresholds),) + the reduced shape.
+
+With numba, a single compiled pass over the inputs computes every
+threshold without temporary arrays; inputs are only copied if the
+summed axes are not the leading ones. Without numba, the sinusoid
+terms are computed once and each threshold's daily values in turn,
+always exactly."""
+
+    mins = np.asarray(mins, dtype=np.float64)
+    maxs = np.asarray(maxs, dtype=np.float64)
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    axes = tuple(range(mins.ndim)) if axis is None else tuple(np.atleast_1d(axis) % max(mins.ndim, 1))
+    kept = [ax for ax in range(mins.ndim) if ax not in axes]
+    shape = tuple(mins.shape[ax] for ax in kept)
+
+    if not jit.available():
+        plus_over_2 = (mins + maxs)/2
+        minus_over_2 = (maxs - mins)/2
+        result = np.empty((len(thresholds),) + shape)
+        for ii, threshold in enumerate(thresholds):
+            result[ii] = np.sum(daily_above_threshold(mins, maxs, plus_over_2, minus_over_2, threshold), axis=axes)
+        return result
+
+    # Arrange as (summed, kept) rows and columns; a view when the summed axes lead
+    order = list(axes) + kept
+    columns = int(np.prod(shape))
+    mins = np.ascontiguousarray(np.transpose(mins, order)).reshape(-1, columns)
+    maxs = np.ascontiguousarray(np.transpose(maxs, order)).reshape(-1, columns)
+
+    totals = np.zeros((len(thresholds), columns))
+    if tolerance is None:
+        sum_above_thresholds(mins, maxs, thresholds, totals)
+    else:
+        sum_above_thresholds_table(mins, maxs, thresholds, get_integral_table(tolerance), totals)
+    return totals.reshape((len(thresholds),) + shape)
+
+@njit('float64(float64, float64, float64)')
+def day_above_threshold(mn, mx, threshold):
+    """Degree-days above threshold for a single day.
+
+This is the integral in daily_above_threshold, simplified using
+cos(2 pi d0) = sqrt(1 - x^2) and cos(2 pi d1) = -sqrt(1 - x^2), where
+x = sin(2 pi d0), so that only one arcsin is evaluated."""
+    plus_over_2 = (mn + mx)/2
+    if math.isnan(plus_over_2):
+        return np.nan
+    if mx <= threshold:
+        return 0.
+    if mn >= threshold:
+        return plus_over_2 - threshold
+
+    minus_over_2 = (mx - mn)/2
+    xx = (threshold - plus_over_2) / minus_over_2
+    return minus_over_2 * math.sqrt(1 - xx*xx) / np.pi + (plus_over_2 - threshold) * (.5 - math.asin(xx) / np.pi)
+
+@njit('void(float64[:, ::1], float64[:, ::1], float64[::1], float64[:, ::1])', nogil=True)
+def sum_above_thresholds(mins, maxs, thresholds, totals):
+    """Add the degree-days above each threshold, summed over the rows of
+mins and maxs, to totals, of shape (thresholds, columns)."""
+    for ii in range(mins.shape[0]):
+        for jj in range(mins.shape[1]):
+            for kk in range(len(thresholds)):
+                totals[kk, jj] += day_above_threshold(mins[ii, jj], maxs[ii, jj], thresholds[kk])
+
+_integral_tables = {} # tolerance -> table
+
+def get_integral_table(tolerance):
+    """Tabulate the degree-days of a day crossing the threshold, per unit
+of its half-range, as a function of x = (threshold - mean) / half-range:
+
+    g(x) = sqrt(1 - x^2) / pi - x (1/2 - arcsin(x) / pi)
+
+The table is uniform over [-1, 1], fine enough that linear interpolation
+is within tolerance of g everywhere. Tables are cached by tolerance."""
+
+    if tolerance not in _integral_tables:
+        def exact(xx):
+            return np.sqrt(1 - xx**2) / np.pi - xx * (.5 - np.arcsin(xx) / np.pi)
+
+        # g'' = 1 / (pi sqrt(1 - x^2)), so the error is largest at the ends,
+        # where it is about 0.067 h^1.5 for a spacing h
+        count = int(np.ceil(2 / (tolerance / .067)**(2. / 3))) + 1
+        while True:
+            grid = np.linspace(-1, 1, count)
+            table = exact(grid)
+            fractions = np.array([4. / 9, .5, 5. / 9])[:, None]
+            points = (grid[:-1] + fractions * (grid[1] - grid[0])).ravel()
+            if np.max(np.abs(np.interp(points, grid, table) - exact(points))) <= tolerance:
+                break
+            count = 2 * count - 1
+
+        table.flags.writeable = False
+        _integral_tables[tolerance] = table
+
+    return _integral_tables[tolerance]
+
+@njit('float64(float64, float64, float64, float64[::1])')
+def day_above_threshold_table(mn, mx, threshold, table):
+    """Degree-days above threshold for a single day, as in
+day_above_threshold, but interpolating the integral from a table from
+get_integral_table."""
+    plus_over_2 = (mn + mx)/2
+    if math.isnan(plus_over_2):
+        return np.nan
+    if mx <= threshold:
+        return 0.
+    if mn >= threshold:
+        return plus_over_2 - threshold
+
+    minus_over_2 = (mx - mn)/2
+    position = ((threshold - plus_over_2) / minus_over_2 + 1) * ((len(table) - 1) / 2.)
+    index = min(int(position), len(table) - 2)
+    fraction = position - index
+    return minus_over_2 * (table[index] + fraction * (table[index + 1] - table[index]))
+
+@njit('void(float64[:, ::1], float64[:, ::1], float64[::1], float64[::1], float64[:, ::1])', nogil=True)
+def sum_above_thresholds_table(mins, maxs, thresholds, table, totals):
+    """As sum_above_thresholds, but using day_above_threshold_table."""
+    for ii in range(mins.shape[0]):
+        for jj in range(mins.shape[1]):
+            for kk in range(len(thresholds)):
+                totals[kk, jj] += day_above_threshold_table(mins[ii, jj], maxs[ii, jj], thresholds[kk], table)
+
+@njit('void(float64[:, ::1], float64[:, ::1], boolean[:, ::1], int64[:, :], float64[::1], float64[::1], float64[:, :, ::1])', nogil=True)
+def sum_seasonal_above_thresholds(mins, maxs, mask, segments, thresholds, table, totals):
+    """Add the degree-days above each threshold, for the (day, column)
+entries where mask is true, to totals[threshold, segments[day, column],
+column]; entries with a negative segment are skipped. An empty table
+gives exact integrals; otherwise, the table is used as in
+day_above_threshold_table."""
+    for ii in range(mins.shape[0]):
+        for jj in range(mins.shape[1]):
+            segment = segments[ii, jj]
+            if not mask[ii, jj] or segment < 0:
+                continue
+            for kk in range(len(thresholds)):
+                if len(table) == 0:
+                    totals[kk, segment, jj] += day_above_threshold(mins[ii, jj], maxs[ii, jj], thresholds[kk])
+                else:
+                    totals[kk, segment, jj] += day_above_threshold_table(mins[ii, jj], maxs[ii, jj], thresholds[kk], table)
+
+def daily_above_threshold(mins, maxs, plus_over_2, minus_over_2, threshold):
+    """Degree-days above threshold for each day, given the sinusoid's
+midpoints, plus_over_2 = (mins + maxs)/2, and half-ranges,
+minus_over_2 = (maxs - mins)/2. This is the NumPy implementation, used
+when numba is unavailable."""
 
     # Determine crossing points, as a fraction of the day
-    plus_over_2 = (mins + maxs)/2
-    minus_over_2 = (maxs - mins)/2
     two_pi = 2*np.pi
-    # d0s is the times of crossing above; d1s is when cross below
-    d0s = np.arcsin((threshold - plus_over_2) / minus_over_2) / two_pi
+    # d0s is the times of crossing above; d1s is when cross below.
+    # Days always above or below give invalid values here, replaced below.
+    with np.errstate(invalid='ignore', divide='ignore'):
+        d0s = np.arcsin((threshold - plus_over_2) / minus_over_2) / two_pi
     d1s = .5 - d0s
 
-    # If always above or below threshold, set crossings accordingly
+    # If always above or below threshold, set crossings accordingly (below wins on flat days)
     aboves = mins >= threshold
     belows = maxs <= threshold
 
-    d0s[aboves] = 0
-    d1s[aboves] = 1
-    d0s[belows] = 0
-    d1s[belows] = 0
+    d0s = np.where(aboves | belows, 0, d0s)
+    d1s = np.where(belows, 0, np.where(aboves, 1, d1s))
 
     # Calculate integral
     F1s = -minus_over_2 * np.cos(2*np.pi*d1s) / two_pi + plus_over_2 * d1s
     F0s = -minus_over_2 * np.cos(2*np.pi*d0s) / two_pi + plus_over_2 * d0s
-    return np.sum(F1s - F0s - threshold * (d1s - d0s))
+    return F1s - F0s - threshold * (d1s - d0s)
 
-def get_gddkdd(mins, maxs, gdd_start, kdd_start):
+def get_gddkdd(mins, maxs, gdd_start, kdd_start, tolerance=None):
     """Get the Growing Degree-Days, as degree-days between gdd_start and
 kdd_start, and Killing Degree-Days, as the degree-days above
 kdd_start.
 
-mins and maxs are numpy arrays; threshold is in the same units."""
+mins and maxs are numpy arrays; threshold is in the same units.
+tolerance is as in above_threshold."""
 
-    dd_lowup = above_threshold(mins, maxs, gdd_start)
-    dd_above = above_threshold(mins, maxs, kdd_start)
+    dd_lowup, dd_above = above_thresholds(mins, maxs, [gdd_start, kdd_start], tolerance=tolerance)
     dd_lower = dd_lowup - dd_above
 
     return dd_lower, dd_above
+
+def get_gddkdd_by_year(mins, maxs, gdd_start, kdd_start, years=None, spacechunk=None, workers=None):
+    """Get the Growing Degree-Days and Killing Degree-Days, as in
+get_gddkdd, summed within each year but not across space, for inputs
+too large to hold in memory.
+
+mins and maxs are (day, ...) arrays that are read one slice at a time:
+numpy arrays or memory-maps, or xarray DataArrays, including
+dask-backed ones. years gives the year of each day, with each year's
+days contiguous; it defaults to the years of the "time" coordinate of
+a DataArray. Each year is split into slices of at most spacechunk
+entries along the first space axis, and slices are processed in
+parallel by up to workers threads, so peak memory is bounded by
+workers times the slice size.
+
+Returns the sorted years, and GDD and KDD arrays of shape
+(len(years),) + mins.shape[1:]."""
+
+    if years is None:
+        if 'time' not in getattr(mins, 'coords', {}):
+            raise ValueError("years must be given unless mins has a time coordinate")
+        years = mins['time'].dt.year.values
+
+    uniques, starts = year_segments(years, mins.shape[0])
+    stops = np.append(starts[1:], mins.shape[0])
+
+    spaceshape = tuple(mins.shape[1:])
+    if spaceshape:
+        spacechunk = spaceshape[0] if spacechunk is None else spacechunk
+        spaces = [slice(ss, ss + spacechunk) for ss in range(0, spaceshape[0], spacechunk)]
+    else:
+        spaces = [None]
+
+    gdds = np.empty((len(uniques),) + spaceshape)
+    kdds = np.empty((len(uniques),) + spaceshape)
+
+    def accumulate(yy, space):
+        index = slice(starts[yy], stops[yy]) if space is None else (slice(starts[yy], stops[yy]), space)
+        dd_lowup, dd_above = above_thresholds(np.asarray(mins[index]), np.asarray(maxs[index]),
+                                              [gdd_start, kdd_start], axis=0)
+        output = yy if space is None else (yy, space)
+        gdds[output] = dd_lowup - dd_above
+        kdds[output] = dd_above
+
+    # The compiled kernels release the GIL, so threads run the slices in parallel;
+    # without numba, only NumPy's ufuncs release it, so they overlap less
+    with ThreadPoolExecutor(workers) as executor:
+        futures = [executor.submit(accumulate, yy, space) for yy in range(len(uniques)) for space in spaces]
+        for future in futures:
+            future.result()
+
+    return uniques, gdds, kdds
+
+def get_gddkdd_by_season(mins, maxs, gdd_start, kdd_start, years, mask=None, season_start=None,
+                         season_end=None, dayofyears=None, seasonyears=None, tolerance=None):
+    """Get the Growing Degree-Days and Killing Degree-Days, as in
+get_gddkdd, summed over each region's growing season in each year.
+
+mins and maxs are (day, region) arrays, and years gives the year of
+each day, with each year's days contiguous. The growing season is
+either a boolean (day, region) mask, or the first and last day of year
+of each region's season, season_start and season_end, inclusive. Days
+of year default to 1, 2, ... from the first day of each year, so
+dayofyears must be given if the first year is incomplete. tolerance is
+as in above_threshold.
+
+Each day is counted in the season-year given by seasonyears, of shape
+(day,) or (day, region), which defaults to years. A season with
+season_start > season_end wraps around the new year, and by default is
+counted in the year it ends, so the first year only has the end of such
+a season, and the start of the last year's season is not counted; days
+whose season-year is not in years are dropped.
+
+The seasons are applied and the days summed into years in a single
+pass, without slicing each region. Returns the sorted years, and GDD
+and KDD arrays of shape (len(years),) + mins.shape[1:]."""
+
+    mins = np.asarray(mins, dtype=np.float64)
+    maxs = np.asarray(maxs, dtype=np.float64)
+    uniques, starts = year_segments(years, mins.shape[0])
+    dayshape = (-1,) + (1,) * (mins.ndim - 1)
+
+    if mask is None:
+        if season_start is None or season_end is None:
+            raise ValueError("Either mask or both season_start and season_end must be given")
+        if dayofyears is None:
+            if (starts[1] if len(starts) > 1 else mins.shape[0]) < 365:
+                raise ValueError("dayofyears must be given when the first year has fewer than 365 days")
+            segments = np.repeat(np.arange(len(uniques)), np.diff(np.append(starts, mins.shape[0])))
+            dayofyears = np.arange(mins.shape[0]) - starts[segments] + 1
+        dayofyears = np.asarray(dayofyears).reshape(dayshape)
+        season_start = np.asarray(season_start)
+        season_end = np.asarray(season_end)
+        wrapped = season_start > season_end
+        mask = np.where(wrapped, (dayofyears >= season_start) | (dayofyears <= season_end),
+                        (dayofyears >= season_start) & (dayofyears <= season_end))
+        if seasonyears is None and np.any(wrapped):
+            # The days from the start of a wrapped season belong to the next year's season
+            seasonyears = np.asarray(years).reshape(dayshape) + (wrapped & (dayofyears >= season_start))
+    mask = np.broadcast_to(mask, mins.shape)
+
+    if seasonyears is None:
+        bydays = True
+        segments = np.repeat(np.arange(len(uniques)), np.diff(np.append(starts, mins.shape[0]))).reshape(dayshape)
+    else:
+        bydays = False
+        seasonyears = np.asarray(seasonyears)
+        if seasonyears.ndim == 1:
+            seasonyears = seasonyears.reshape(dayshape)
+        segments = np.searchsorted(uniques, seasonyears)
+        segments[uniques[np.minimum(segments, len(uniques) - 1)] != seasonyears] = -1
+    segments = np.broadcast_to(segments, mins.shape)
+
+    spaceshape = mins.shape[1:]
+    thresholds = np.array([gdd_start, kdd_start], dtype=np.float64)
+
+    if not jit.available():
+        plus_over_2 = (mins + maxs)/2
+        minus_over_2 = (maxs - mins)/2
+        totals = np.empty((2, len(uniques)) + spaceshape)
+        for kk, threshold in enumerate(thresholds):
+            daily = np.where(mask, daily_above_threshold(mins, maxs, plus_over_2, minus_over_2, threshold), 0)
+            if bydays:
+                totals[kk] = np.add.reduceat(daily, starts, axis=0)
+            else:
+                for yy in range(len(uniques)):
+                    totals[kk, yy] = np.sum(np.where(segments == yy, daily, 0), axis=0)
+    else:
+        columns = int(np.prod(spaceshape))
+        table = np.empty(0) if tolerance is None else get_integral_table(tolerance)
+        totals = np.zeros((2, len(uniques), columns))
+        sum_seasonal_above_thresholds(np.ascontiguousarray(mins).reshape(-1, columns),
+                                      np.ascontiguousarray(maxs).reshape(-1, columns),
+                                      np.ascontiguousarray(mask, dtype=np.bool_).reshape(-1, columns),
+                                      segments.astype(np.int64, copy=False).reshape(-1, columns),
+                                      thresholds, table, totals)
+        totals = totals.reshape((2, len(uniques)) + spaceshape)
+
+    return uniques, totals[0] - totals[1], totals[1]
+
+def year_segments(years, count):
+    """Check that years gives the year of each of count days, in order,
+and return the sorted years and the index of each one's first day."""
+    years = np.asarray(years)
+    if len(years) != count or np.any(np.diff(years) < 0):
+        raise ValueError("years must give the year of each day, in order")
+
+    return np.unique(years, return_index=True)
@@ -0,0 +1,101 @@
+"""
+Optional, lazy numba compilation for the numerical kernels in impactcommon.math.
+
+Functions decorated with `njit` are only compiled, and numba only imported,
+when they are first called. Compiled code is cached on disk (in __pycache__,
+or under NUMBA_CACHE_DIR), so later processes load it instead of compiling;
+`python -m impactcommon.math.warmup` fills that cache ahead of time. If numba
+is unavailable, the kernels run as plain Python functions with the same
+results.
+"""
+
+import functools
+import sys
+
+registry = [] # every LazyDispatcher created by njit
+
+
+class LazyDispatcher(object):
+    """
+    Stand-in for a numba-compiled function, importing numba and compiling the
+    function when it is first called.
+
+    Once compiled, the dispatcher replaces this object as the attribute of its
+    module, so later calls go to it directly. It can also be called from other
+    numba code, which compiles it as needed.
+    """
+    def __init__(self, func, signatures, options):
+        functools.update_wrapper(self, func)
+        self.py_func = func
+        self.signatures = signatures
+        self.options = options
+        self._dispatcher = None
+
+    @property
+    def dispatcher(self):
+        "The numba dispatcher, or the Python function if numba is unavailable."
+        if self._dispatcher is None:
+            try:
+                import numba
+            except ImportError:
+                numba = None
+            self._dispatcher = self.py_func if numba is None else numba.njit(**self.options)(self.py_func)
+
+            module = sys.modules.get(self.py_func.__module__)
+            if getattr(module, self.py_func.__name__, None) is self:
+                setattr(module, self.py_func.__name__, self._dispatcher)
+
+        return self._dispatcher
+
+    def compile(self):
+        "Compile every declared signature, loading from or saving to the on-disk cache."
+        dispatcher = self.dispatcher
+        if dispatcher is not self.py_func:
+            for signature in self.signatures:
+                dispatcher.compile(signature)
+
+    def __call__(self, *args, **kwargs):
+        return self.dispatcher(*args, **kwargs)
+
+    @property
+    def _numba_type_(self):
+        # Lets numba type this object as the dispatcher, when it is used in other numba code
+        return self.dispatcher._numba_type_
+
+
+_available = None
+
+def available():
+    "Whether numba can be imported, so that kernels are compiled."
+    global _available
+    if _available is None:
+        try:
+            import numba
+            _available = True
+        except ImportError:
+            _available = False
+    return _available
+
+
+def njit(*args, **kwargs):
+    """
+    Use as @njit or @njit(signatures, **options), like numba.njit but lazy and
+    with cache=True by default.
+
+    Unlike numba.njit, the signatures do not restrict compilation: they list the
+    types that `LazyDispatcher.compile` builds ahead of time.
+    """
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return njit()(args[0])
+
+    signatures = args[0] if args else []
+    if isinstance(signatures, str):
+        signatures = [signatures]
+    kwargs.setdefault('cache', True)
+
+    def decorator(func):
+        dispatcher = LazyDispatcher(func, signatures, kwargs)
+        registry.append(dispatcher)
+        return dispatcher
+
+    return decorator
@@ -5,14 +5,16 @@
 
 ## Find extremum of expression of the form intercept x + sum(coeffs[i] (x - offsets[i])^3)
 import numpy as np
-from openest.models.curve import CubicSplineCurve
+from . import cubicspline
 
 def quadratic(aa, bb, cc):
-    if bb**2 - 4 * aa * cc < 0:
+    # bb * bb rather than bb**2, which numpy rounds differently for scalars and arrays
+    discriminant = bb * bb - 4 * aa * cc
+    if discriminant < 0:
         return np.array([]), np.array([])
 
-    one = (-bb + np.sqrt(bb**2 - 4 * aa * cc)) / (2 * aa)
-    two = (-bb - np.sqrt(bb**2 - 4 * aa * cc)) / (2 * aa)
+    one = (-bb + np.sqrt(discriminant)) / (2 * aa)
+    two = (-bb - np.sqrt(discriminant)) / (2 * aa)
     points = np.array([one, two])
     seconds = np.sign(2 * aa * points + bb)
 
@@ -61,8 +63,7 @@ def findsplinemin(knots, coeffs, minx, maxx):
     allpoints.extend([minx, maxx])
 
     # Determine the true lowest
-    curve = CubicSplineCurve(knots, coeffs)
-    minpt = np.argmin(curve(np.array(allpoints)))
+    minpt = np.argmin(cubicspline.spline(knots, coeffs, allpoints))
 
     return allpoints[minpt]
 
@@ -70,3 +71,67 @@ def findsplinemin(knots, coeffs, minx, maxx):
 def findsplinemax(knots, coeffs, minx, maxx):
     x = findsplinemin(knots, -np.asarray(coeffs), minx, maxx)
     return x
+
+
+## Batched versions, for many coefficient sets sharing the same knots
+
+def findsplinemin_many(knots, coeffs, minx, maxx):
+    """Find the minimum of many cubic splines with the same knots, giving
+    the same results as findsplinemin on each.
+
+    coeffs is an (N, len(knots) - 1) array, with one spline per row;
+    returns an array of the N minima. The quadratics for every segment are
+    solved for all rows at once."""
+    coeffs = np.asarray(coeffs, dtype=np.float64)
+    candidates = [] # columns of candidate points, in the order findsplinemin considers them
+    valids = []
+
+    def addminwithin(terms, offsets, lowerx, upperx):
+        # As findminwithin, with terms as columns of per-row coefficients
+        terms = np.stack(terms, axis=1)
+        offsets = np.array(offsets)
+        aa = np.sum(3 * terms, axis=1)
+        bb = np.sum(-6 * terms * offsets, axis=1)
+        cc = coeffs[:, 0] + np.sum(3 * terms * (offsets**2), axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            discriminant = bb * bb - 4 * aa * cc # as in quadratic
+            for points in [(-bb + np.sqrt(discriminant)) / (2 * aa), (-bb - np.sqrt(discriminant)) / (2 * aa)]:
+                seconds = np.sign(2 * aa * points + bb)
+                candidates.append(points)
+                valids.append(~(discriminant < 0) & (seconds > 0) & (points >= lowerx) & (points <= upperx))
+
+    knotKm1 = ([], []) # coeffs, offsets for x > knots[-2]
+    knotK = ([], []) # coeffs, offsets for x > knots[-1]
+    for kk in range(1, len(knots)-1):
+        addminwithin([coeffs[:, ii] for ii in range(1, kk+1)], knots[0:kk], knots[kk-1], knots[kk])
+
+        knotKm1[0].extend([coeffs[:, kk], -coeffs[:, kk] * (knots[-1] - knots[kk-1]) / (knots[-1] - knots[-2])])
+        knotKm1[1].extend([knots[kk-1], knots[-2]])
+        knotK[0].extend([coeffs[:, kk], -coeffs[:, kk] * (knots[-1] - knots[kk-1]) / (knots[-1] - knots[-2]), coeffs[:, kk] * (knots[-2] - knots[kk-1]) / (knots[-1] - knots[-2])])
+        knotK[1].extend([knots[kk-1], knots[-2], knots[-1]])
+
+    addminwithin(knotKm1[0], knotKm1[1], knots[-2], knots[-1])
+    addminwithin(knotK[0], knotK[1], knots[-1], np.inf)
+
+    for knot in knots: # Could also be edge-points
+        candidates.append(np.full(len(coeffs), knot, dtype=np.float64))
+        valids.append(np.full(len(coeffs), True))
+
+    candidates = np.stack(candidates, axis=1)
+    valids = np.stack(valids, axis=1) & (candidates > minx) & (candidates < maxx)
+    candidates = np.hstack([candidates, np.full((len(coeffs), 2), [minx, maxx], dtype=np.float64)])
+    valids = np.hstack([valids, np.full((len(coeffs), 2), True)])
+
+    # Determine the true lowest, taking the first in case of ties (or NaNs) as np.argmin does
+    values = np.empty(candidates.shape)
+    cubicspline.evaluate_splines(np.asarray(knots, dtype=np.float64), np.ascontiguousarray(coeffs), np.where(valids, candidates, 0), values)
+    isnan = valids & np.isnan(values)
+    lowest = np.min(np.where(valids & ~isnan, values, np.inf), axis=1)
+    chosen = np.where(np.any(isnan, axis=1)[:, None], isnan, valids & (values == lowest[:, None]))
+    return candidates[np.arange(len(coeffs)), np.argmax(chosen, axis=1)]
+
+
+def findsplinemax_many(knots, coeffs, minx, maxx):
+    return findsplinemin_many(knots, -np.asarray(coeffs), minx, maxx)
+
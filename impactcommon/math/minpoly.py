@@ -30,6 +30,123 @@ def findpolymin(coeffs, minx, maxx):
 
     return possibles[index]
 
+def findpolymin_many(coeffs, minx, maxx):
+    """Batched findpolymin, for an (N, order + 1) array of coefficients with
+    one polynomial per row, ordered as for findpolymin. Returns the N minima.
+
+    For quartics, the roots of the derivative are found in closed form;
+    otherwise, from the eigenvalues of the derivatives' companion matrices."""
+    coeffs = np.atleast_2d(np.asarray(coeffs, dtype=np.float64))
+    derivcoeffs = coeffs[:, 1:] * np.arange(1, coeffs.shape[1]) # Construct the derivatives
+
+    if coeffs.shape[1] == 5:
+        roots, valids = cubicroots(derivcoeffs)
+    else:
+        roots, valids = polyroots(derivcoeffs)
+
+    # Candidates are the real roots within the bounds, then the bounds themselves
+    valids &= (roots >= minx) & (roots <= maxx)
+    possibles = np.hstack([np.where(valids, roots, 0), np.full((len(coeffs), 2), [minx, maxx], dtype=np.float64)])
+    valids = np.hstack([valids, np.full((len(coeffs), 2), True)])
+
+    with np.errstate(invalid='ignore', over='ignore'): # catch warnings from using infs
+        values = np.zeros(possibles.shape)
+        for kk in range(coeffs.shape[1] - 1, -1, -1):
+            values = values * possibles + coeffs[:, kk:kk+1]
+
+    # polyval doesn't handle infs well
+    if minx == -np.inf:
+        if coeffs.shape[1] % 2 == 1: # largest power is even
+            values[:, -2] = np.where(coeffs[:, -1] < 0, -np.inf, np.inf)
+        else: # largest power is odd
+            values[:, -2] = np.where(coeffs[:, -1] < 0, np.inf, -np.inf)
+
+    if maxx == np.inf:
+        values[:, -1] = np.where(coeffs[:, -1] > 0, np.inf, -np.inf)
+
+    index = np.argmin(np.where(valids, values, np.inf), axis=1)
+    rows = np.arange(len(coeffs))
+    # If every valid value is inf, take the first valid candidate, as findpolymin would
+    index = np.where(valids[rows, index], index, np.argmax(valids, axis=1))
+    minima = possibles[rows, index]
+
+    # Ties between distinct candidates are broken by the order of np.roots, so defer to findpolymin
+    best = values[rows, index][:, None]
+    with np.errstate(invalid='ignore'):
+        tied = valids & (np.abs(values - best) <= 1e-9 * (1 + np.abs(best))) & (possibles != minima[:, None])
+    for row in np.nonzero(np.any(tied, axis=1))[0]:
+        minima[row] = findpolymin(coeffs[row], minx, maxx)
+
+    return minima
+
+def polyroots(coeffs):
+    """Roots of many polynomials, with coeffs as an (N, order + 1) array from
+    the intercept to the highest order. Returns the (N, order) roots and
+    whether each is real; missing roots of lower-order rows are not real.
+    Like np.roots, roots with imaginary parts within real_if_close's
+    tolerance are treated as real."""
+    order = coeffs.shape[1] - 1
+    roots = np.zeros((len(coeffs), order), dtype=np.complex128)
+    valids = np.zeros((len(coeffs), order), dtype=bool)
+
+    # Group the rows by their actual order, ignoring zero leading coefficients
+    degrees = np.where(coeffs != 0, np.arange(coeffs.shape[1]), 0).max(axis=1)
+    for degree in np.unique(degrees):
+        if degree == 0:
+            continue
+        rows = np.nonzero(degrees == degree)[0]
+        companion = np.zeros((len(rows), degree, degree))
+        companion[:, 0, :] = -coeffs[rows, degree-1::-1] / coeffs[rows, degree:degree+1]
+        companion[:, np.arange(1, degree), np.arange(degree - 1)] = 1
+        roots[rows, :degree] = np.linalg.eigvals(companion)
+        valids[rows, :degree] = True
+
+    valids &= np.abs(roots.imag) < 100 * np.finfo(np.float64).eps
+    return roots.real, valids
+
+def cubicroots(coeffs):
+    """Real roots of many cubics, with coeffs as an (N, 4) array from the
+    intercept to the cubic term, in closed form. Returns the (N, 3) roots and
+    whether each is real and distinct; rows that are not cubic are passed to
+    polyroots."""
+    roots = np.zeros((len(coeffs), 3))
+    valids = np.zeros((len(coeffs), 3), dtype=bool)
+
+    cubic = coeffs[:, 3] != 0
+    if not np.all(cubic):
+        roots[~cubic], valids[~cubic] = polyroots(coeffs[~cubic])
+
+    # Depress x^3 + b x^2 + c x + d to t^3 + p t + q, with x = t - b / 3
+    aa = coeffs[cubic, 3]
+    bb, cc, dd = coeffs[cubic, 2] / aa, coeffs[cubic, 1] / aa, coeffs[cubic, 0] / aa
+    pp = cc - bb**2 / 3
+    qq = 2 * bb**3 / 27 - bb * cc / 3 + dd
+    shift = -bb / 3
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        discriminant = qq**2 / 4 + pp**3 / 27
+        # One real root (or repeated roots, which are not extrema): Cardano's formula
+        sqrtdisc = np.sqrt(np.maximum(discriminant, 0))
+        cardano = np.cbrt(-qq / 2 + sqrtdisc) + np.cbrt(-qq / 2 - sqrtdisc) + shift
+        # Three real roots: trigonometric solution
+        scale = 2 * np.sqrt(-pp / 3)
+        angle = np.arccos(np.clip(3 * qq / (pp * scale), -1, 1)) / 3
+        trig = scale[:, None] * np.cos(angle[:, None] - 2 * np.pi * np.arange(3) / 3) + shift[:, None]
+
+    three = discriminant < 0
+    found = np.where(three[:, None], trig, np.stack([cardano, np.zeros(len(aa)), np.zeros(len(aa))], axis=1))
+
+    # Polish with a Newton step on the original cubic
+    with np.errstate(invalid='ignore', divide='ignore'):
+        value = ((found + bb[:, None]) * found + cc[:, None]) * found + dd[:, None]
+        slope = (3 * found + 2 * bb[:, None]) * found + cc[:, None]
+        polished = found - value / slope
+    found = np.where(np.isfinite(polished) & (np.abs(polished - found) < np.abs(found) * 1e-6 + 1e-12), polished, found)
+
+    roots[cubic] = found
+    valids[cubic] = np.stack([np.ones(len(aa), dtype=bool), three, three], axis=1) & np.isfinite(found)
+    return roots, valids
+
 if __name__ == '__main__':
     print(findpolymin([0, 0, -3, 1, 2], -np.inf, np.inf))
     print(findpolymin([0, 0, -3, 1, 2], 0, np.inf))
@@ -0,0 +1,30 @@
+"""
+Precompile the numba kernels in impactcommon.math into numba's on-disk cache.
+
+Run this once per environment, as `python -m impactcommon.math.warmup`, so
+that worker processes load compiled kernels instead of compiling them.
+"""
+
+import importlib
+import time
+from . import jit
+
+MODULES = ['impactcommon.math.averages', 'impactcommon.math.gddkdd', 'impactcommon.math.cubicspline']
+
+
+def warmup():
+    """Compile the declared signatures of every kernel in MODULES; return the number compiled."""
+    for name in MODULES:
+        importlib.import_module(name)
+
+    count = 0
+    for dispatcher in jit.registry:
+        dispatcher.compile()
+        count += len(dispatcher.signatures)
+    return count
+
+
+if __name__ == '__main__':
+    time0 = time.time()
+    count = warmup()
+    print("Compiled %d signatures in %.2f seconds" % (count, time.time() - time0))
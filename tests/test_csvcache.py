@@ -0,0 +1,100 @@
+"""
+Tests for the on-disk cache of parsed CSVs, impactcommon.exogenous_economy.csvcache
+"""
+import multiprocessing
+import os
+import pytest
+import pandas as pd
+from impactcommon.exogenous_economy import csvcache
+
+
+@pytest.fixture
+def csvpath(tmpdir, monkeypatch):
+    """A small CSV, with the cache directory in the tmp directory"""
+    monkeypatch.setenv("IMPACTCOMMON_CSV_CACHE", str(tmpdir.join("cache")))
+    path = str(tmpdir.join("baseline.csv"))
+    pd.DataFrame({"iso": ["foo", "bar"], "value": [1.0, 2.0]}).to_csv(path, index=False)
+    return path
+
+
+def cached_entries(cachedir):
+    return sorted(os.listdir(cachedir)) if os.path.exists(cachedir) else []
+
+
+def test_read_csv_cached(csvpath, mocker):
+    """The second read is served from the cache"""
+    spy = mocker.spy(csvcache.metacsv, "read_csv")
+    first = csvcache.read_csv(csvpath)
+    second = csvcache.read_csv(csvpath)
+
+    assert spy.call_count == 1
+    pd.testing.assert_frame_equal(first, second)
+    assert type(first) is type(second)
+    assert len(cached_entries(csvcache.get_cache_dir())) == 1
+
+
+def test_read_csv_invalidated(csvpath, mocker):
+    """Changing the source replaces its entry"""
+    csvcache.read_csv(csvpath)
+    pd.DataFrame({"iso": ["foo"], "value": [3.0]}).to_csv(csvpath, index=False)
+    os.utime(csvpath, ns=(0, os.stat(csvpath).st_mtime_ns + 1))
+
+    spy = mocker.spy(csvcache.metacsv, "read_csv")
+    df = csvcache.read_csv(csvpath)
+    assert spy.call_count == 1
+    assert list(df.value) == [3.0]
+
+    entries = cached_entries(csvcache.get_cache_dir())
+    assert entries == [csvcache.get_cache_key(csvpath)[1]]
+
+
+@pytest.mark.parametrize("setting", ["", "0"])
+def test_read_csv_disabled(csvpath, monkeypatch, setting, mocker):
+    """The cache can be disabled by environment variable, or per call"""
+    spy = mocker.spy(csvcache.metacsv, "read_csv")
+    cachedir = csvcache.get_cache_dir()
+
+    csvcache.read_csv(csvpath, cache=False)
+    csvcache.read_csv(csvpath, cache=False)
+    assert spy.call_count == 2
+    assert cached_entries(cachedir) == []
+
+    monkeypatch.setenv("IMPACTCOMMON_CSV_CACHE", setting)
+    assert csvcache.get_cache_dir() is None
+    csvcache.read_csv(csvpath)
+    assert spy.call_count == 3
+    assert cached_entries(cachedir) == []
+
+
+def test_read_csv_parser_versions(csvpath, monkeypatch, mocker):
+    """Entries are specific to the pandas and metacsv versions that parsed them"""
+    csvcache.read_csv(csvpath)
+    assert csvcache.get_cache_key(csvpath)[1].endswith("-pandas%s-metacsv%s.pkl" % (pd.__version__,
+                                                                                     csvcache.metacsv.__version__))
+
+    monkeypatch.setattr(csvcache, "PARSER_VERSIONS", "pandas0-metacsv0")
+    spy = mocker.spy(csvcache.metacsv, "read_csv")
+    csvcache.read_csv(csvpath)
+    assert spy.call_count == 1
+    assert cached_entries(csvcache.get_cache_dir()) == [csvcache.get_cache_key(csvpath)[1]]
+
+
+def test_read_csv_not_local(csvpath, mocker):
+    """Sources that are not local files, such as URLs, are read without the cache"""
+    df = pd.DataFrame({"iso": ["foo"], "value": [1.0]})
+    read_csv = mocker.patch.object(csvcache.metacsv, "read_csv", return_value=df)
+
+    assert csvcache.read_csv("https://example.com/baseline.csv") is df
+    read_csv.assert_called_once_with("https://example.com/baseline.csv")
+    assert cached_entries(csvcache.get_cache_dir()) == []
+
+
+def test_read_csv_concurrent(csvpath):
+    """Many processes populating the cache at once leave one complete entry"""
+    with multiprocessing.get_context("spawn").Pool(8) as pool:
+        dfs = pool.map(csvcache.read_csv, [csvpath] * 32)
+
+    for df in dfs:
+        assert list(df.value) == [1.0, 2.0]
+    assert cached_entries(csvcache.get_cache_dir()) == [csvcache.get_cache_key(csvpath)[1]]
+    assert list(csvcache.read_csv(csvpath).value) == [1.0, 2.0]
@@ -7,6 +7,12 @@ import pandas as pd
 from impactcommon.exogenous_economy import gdppc
 
 
+@pytest.fixture(autouse=True)
+def csv_cache_dir(tmpdir, monkeypatch):
+    """Keep any cached CSVs in the tmp directory"""
+    monkeypatch.setenv("IMPACTCOMMON_CSV_CACHE", str(tmpdir.join("csvcache")))
+
+
 @pytest.fixture
 def support_dfs():
     """Setup, return simple unclean support baseline, growth, nightlight pd.DataFrame files, like those in shareddirs
@@ -197,3 +203,126 @@ def test_gdppcprovider(tmpsetup_shareddir):
     testprovider = gdppc.GDPpcProvider(iam=input_iam, ssp=input_ssp, stopyear=2020)
     actual = testprovider.get_timeseries(hierid="fooSPAM")
     np.testing.assert_array_equal(actual, goal)
+
+
+@pytest.mark.parametrize(
+    "stopyear, goal",
+    [
+        pytest.param(2010, np.array([1.]), id="baseline only"),
+        pytest.param(2012, np.array([1., 2., 4.]), id="within first period"),
+    ],
+)
+def test_hierarchicalgdppcprovider_get_iso_timeseries_short(support_dfs, stopyear, goal):
+    """HierarchicalGDPpcProvider.get_iso_timeseries for series shorter than one growth period"""
+    baseline_df, growth_df, df_nightlights = support_dfs
+
+    testprovider = gdppc.HierarchicalGDPpcProvider(
+        iam="foo",
+        ssp="SSP3",
+        df_baseline=baseline_df,
+        df_growth=growth_df,
+        df_nightlights=df_nightlights,
+        startyear=2010,
+        stopyear=stopyear
+    )
+    np.testing.assert_array_equal(testprovider.get_iso_timeseries(iso="foo"), goal)
+
+
+def test_hierarchicalgdppcprovider_get_iso_timeseries_missing_growth(support_dfs):
+    """HierarchicalGDPpcProvider.get_iso_timeseries raises if growth rates do not cover the years"""
+    baseline_df, growth_df, df_nightlights = support_dfs
+
+    testprovider = gdppc.HierarchicalGDPpcProvider(
+        iam="foo",
+        ssp="SSP3",
+        df_baseline=baseline_df,
+        df_growth=growth_df,
+        df_nightlights=df_nightlights,
+        startyear=2010,
+        stopyear=2030
+    )
+    with pytest.raises(ValueError):
+        testprovider.get_iso_timeseries(iso="foo")
+
+
+@pytest.mark.parametrize("iam", ["low", "high", "foo"])
+@pytest.mark.parametrize("stopyear", [2010, 2020, 2030])
+def test_hierarchicalgdppcprovider_eager(support_dfs, iam, stopyear):
+    """An eager HierarchicalGDPpcProvider gives the same series, and errors, as a lazy one"""
+    baseline_df, growth_df, df_nightlights = support_dfs
+
+    providers = [
+        gdppc.HierarchicalGDPpcProvider(
+            iam=iam,
+            ssp="SSP3",
+            df_baseline=baseline_df,
+            df_growth=growth_df.copy(),
+            df_nightlights=df_nightlights,
+            startyear=2010,
+            stopyear=stopyear,
+            eager=eager
+        ) for eager in [False, True]
+    ]
+    for iso in ["foo", "bar", "baz"]:
+        try:
+            goal = providers[0].get_iso_timeseries(iso=iso)
+        except ValueError:
+            with pytest.raises(ValueError):
+                providers[1].get_iso_timeseries(iso=iso)
+            continue
+
+        actual = providers[1].get_iso_timeseries(iso=iso)
+        np.testing.assert_array_equal(actual, goal)
+        assert not actual.flags.writeable
+
+
+@pytest.mark.parametrize("eager", [False, True])
+def test_hierarchicalgdppcprovider_get_timeseries_many(support_dfs, eager):
+    """HierarchicalGDPpcProvider.get_timeseries_many stacks get_timeseries for each hierid"""
+    baseline_df, growth_df, df_nightlights = support_dfs
+    df_nightlights = pd.DataFrame(
+        {
+            "hierid": ["fooSPAM", "fooHAM", "bazSPAM", "fooSPAM"],
+            "gdppc_ratio": [2.0, np.nan, 0.0, 3.0],
+        }
+    )
+
+    testprovider = gdppc.HierarchicalGDPpcProvider(
+        iam="low",
+        ssp="SSP3",
+        df_baseline=baseline_df,
+        df_growth=growth_df,
+        df_nightlights=df_nightlights,
+        startyear=2010,
+        stopyear=2020,
+        eager=eager
+    )
+    hierids = ["fooSPAM", "bazEGGS", "fooHAM", "bazSPAM", "fooEGGS", "fooSPAM"]
+    actual = testprovider.get_timeseries_many(hierids)
+
+    goal = np.stack([testprovider.get_timeseries(hierid=hierid) for hierid in hierids])
+    np.testing.assert_array_equal(actual, goal)
+    np.testing.assert_array_equal(actual[0], 2 * actual[4])
+    np.testing.assert_array_equal(actual[2], 0.8 * actual[4])
+    np.testing.assert_array_equal(actual[3], 0.8 * actual[1])
+    assert testprovider.get_timeseries_many([]).shape == (0, 11)
+
+
+def test_read_hierarchicalgdppcprovider_eager(tmpsetup):
+    """An eager provider read through metacsv gives the same series as a lazy one"""
+    gdppc_baseline_path, gdppc_growth_path, nightlights_path = tmpsetup
+
+    providers = [
+        gdppc.read_hierarchicalgdppcprovider(
+            iam="low",
+            ssp="SSP3",
+            growth_path_or_buffer=str(gdppc_growth_path),
+            baseline_path_or_buffer=str(gdppc_baseline_path),
+            nightlights_path_or_buffer=str(nightlights_path),
+            stopyear=2020,
+            eager=eager
+        ) for eager in [False, True]
+    ]
+    assert providers[1].gdppcs is not None
+    for hierid in ["fooSPAM", "fooEGGS", "baz"]:
+        np.testing.assert_array_equal(providers[1].get_timeseries(hierid=hierid), providers[0].get_timeseries(hierid=hierid))
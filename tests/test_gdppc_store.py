@@ -0,0 +1,134 @@
+"""
+Tests for building and serving GDPpc stores, in impactcommon.exogenous_economy.build and .store
+"""
+import pytest
+import numpy as np
+import pandas as pd
+from impactcommon.exogenous_economy import build, gdppc, store
+
+
+@pytest.fixture
+def support_dfs():
+    """Baseline, growth and nightlight pd.DataFrames covering two IAMs and two ISOs"""
+    baseline_df = pd.DataFrame(
+        {
+            "year": [2010, 2010, 2010, 2010],
+            "model": ["low", "low", "high", "low"],
+            "scenario": ["SSP3", "SSP3", "SSP3", "SSP4"],
+            "iso": ["foo", "bar", "bar", "foo"],
+            "value": np.arange(4, dtype=np.float64) + 1,
+        }
+    )
+    growth_df = pd.DataFrame(
+        {
+            "year": [2010, 2015, 2010, 2015, 2010, 2015],
+            "model": ["low", "low", "low", "low", "high", "high"],
+            "scenario": ["SSP3", "SSP3", "SSP3", "SSP3", "SSP3", "SSP3"],
+            "iso": ["foo", "foo", "bar", "bar", "foo", "foo"],
+            "growth": [1.1, 1.2, 1.05, 1.0, 0.9, 1.3],
+        }
+    )
+    df_nightlights = pd.DataFrame(
+        {
+            "hierid": ["fooSPAM", "barSPAM", "barEGGS"],
+            "gdppc_ratio": [2.0, 0.0, 0.5],
+        }
+    )
+    return baseline_df, growth_df, df_nightlights
+
+
+@pytest.mark.parametrize("format, name", [("npy", "gdppc"), ("netcdf", "gdppc.nc")])
+def test_stored_gdppc_provider(support_dfs, tmpdir, format, name):
+    """StoredGDPpcProvider serves the same series as HierarchicalGDPpcProvider, including for unknown ISOs"""
+    baseline_df, growth_df, df_nightlights = support_dfs
+
+    cube, failed, scenarios, hierids, years = build.build_gdppc_cube(baseline_df, growth_df, df_nightlights,
+                                                                     stopyear=2020)
+    assert scenarios == [("high", "SSP3"), ("low", "SSP3")]
+    assert hierids == ["bar", "barEGGS", "barSPAM", "foo", "fooSPAM", store.get_iso_key("bar"),
+                       store.get_iso_key("foo"), store.GLOBAL_HIERID]
+    assert cube.shape == (2, 8, 11)
+    assert not np.any(failed)
+
+    path = str(tmpdir.join(name))
+    store.write_gdppc_store(path, cube, failed, scenarios, hierids, years, format=format)
+
+    for iam, ssp in scenarios:
+        goal = gdppc.HierarchicalGDPpcProvider(iam, ssp, baseline_df, growth_df.copy(), df_nightlights, stopyear=2020)
+        testprovider = store.StoredGDPpcProvider(path, iam, ssp)
+        assert testprovider.get_startyear() == 2010
+
+        for hierid in ["fooSPAM", "barSPAM", "barEGGS", "fooEGGS", "bar", "bazSPAM"]:
+            np.testing.assert_array_equal(testprovider.get_timeseries(hierid), goal.get_timeseries(hierid))
+        np.testing.assert_array_equal(testprovider.get_timeseries_many(["fooSPAM", "barEGGS", "baz"]),
+                                      goal.get_timeseries_many(["fooSPAM", "barEGGS", "baz"]))
+
+    with pytest.raises(KeyError):
+        store.StoredGDPpcProvider(path, "low", "SSP5")
+
+
+@pytest.mark.parametrize("hierids", [None, ["barSPAM"]])
+def test_stored_gdppc_provider_unlisted(support_dfs, tmpdir, hierids):
+    """Regions not in the store get their ISO's series, unscaled by any ratio of the ISO itself,
+    as in HierarchicalGDPpcProvider"""
+    baseline_df, growth_df, df_nightlights = support_dfs
+    df_nightlights = pd.concat([df_nightlights, pd.DataFrame({"hierid": ["foo"], "gdppc_ratio": [1.3]})])
+
+    cube, failed, scenarios, labels, years = build.build_gdppc_cube(baseline_df, growth_df, df_nightlights,
+                                                                    scenarios=[("low", "SSP3")], hierids=hierids,
+                                                                    stopyear=2020)
+    path = str(tmpdir.join("gdppc"))
+    store.write_gdppc_store(path, cube, failed, scenarios, labels, years)
+
+    goal = gdppc.HierarchicalGDPpcProvider("low", "SSP3", baseline_df, growth_df.copy(), df_nightlights, stopyear=2020)
+    testprovider = store.StoredGDPpcProvider(path, "low", "SSP3")
+    for hierid in ["foo.1", "fooEGGS", "bar.1", "barSPAM", "baz.1"]:
+        np.testing.assert_array_equal(testprovider.get_timeseries(hierid), goal.get_timeseries(hierid))
+    assert not np.allclose(testprovider.get_timeseries("foo.1") * 1.3, goal.get_timeseries("foo.1"))
+    if hierids is None:
+        np.testing.assert_array_equal(testprovider.get_timeseries("foo"), goal.get_timeseries("foo"))
+
+
+def test_build_main(support_dfs, tmpdir, monkeypatch):
+    """The build command writes a memory-mapped store for the requested scenarios"""
+    monkeypatch.setenv("IMPACTCOMMON_CSV_CACHE", str(tmpdir.join("csvcache")))
+    baseline_df, growth_df, df_nightlights = support_dfs
+    paths = []
+    for df, name in zip(support_dfs, ["baseline.csv", "growth.csv", "nightlights.csv"]):
+        paths.append(str(tmpdir.join(name)))
+        df.to_csv(paths[-1], index=False)
+
+    path = str(tmpdir.join("gdppc"))
+    build.main([path, "--baseline", paths[0], "--growth", paths[1], "--nightlights", paths[2],
+                "--scenario", "low:SSP3", "--stopyear", "2020"])
+
+    testprovider = store.StoredGDPpcProvider(path, "low", "SSP3")
+    assert isinstance(testprovider.gdppcs.base, np.memmap)
+    goal = gdppc.HierarchicalGDPpcProvider("low", "SSP3", baseline_df, growth_df, df_nightlights, stopyear=2020)
+    np.testing.assert_array_equal(testprovider.get_timeseries("fooSPAM"), goal.get_timeseries("fooSPAM"))
+    with pytest.raises(KeyError):
+        store.StoredGDPpcProvider(path, "high", "SSP3")
+
+
+@pytest.mark.parametrize("format, name", [("npy", "gdppc"), ("netcdf", "gdppc.nc")])
+def test_build_gdppc_cube_missing_growth(support_dfs, tmpdir, format, name):
+    """Regions whose ISO lacks growth rates are marked failed, with a warning, and raise as in HierarchicalGDPpcProvider"""
+    baseline_df, growth_df, df_nightlights = support_dfs
+
+    with pytest.warns(UserWarning):
+        cube, failed, scenarios, hierids, years = build.build_gdppc_cube(baseline_df, growth_df, df_nightlights,
+                                                                         scenarios=[("low", "SSP3")], stopyear=2025)
+    assert np.all(failed)
+    assert np.all(np.isnan(cube))
+
+    path = str(tmpdir.join(name))
+    store.write_gdppc_store(path, cube, failed, scenarios, hierids, years, format=format)
+    testprovider = store.StoredGDPpcProvider(path, "low", "SSP3")
+    goal = gdppc.HierarchicalGDPpcProvider("low", "SSP3", baseline_df, growth_df, df_nightlights, stopyear=2025)
+    for hierid in ["fooSPAM", "bar", "bazSPAM"]:
+        with pytest.raises(ValueError):
+            goal.get_timeseries(hierid)
+        with pytest.raises(ValueError):
+            testprovider.get_timeseries(hierid)
+    with pytest.raises(ValueError):
+        testprovider.get_timeseries_many(["fooSPAM", "barEGGS"])
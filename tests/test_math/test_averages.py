@@ -0,0 +1,242 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+from impactcommon.math import averages
+
+
+SCALAR_BATCH_PAIRS = [
+    (averages.MeanAverager, averages.BatchMeanAverager),
+    (averages.MedianAverager, averages.BatchMedianAverager),
+    (averages.BucketAverager, averages.BatchBucketAverager),
+    (averages.KernelMeanAverager, averages.BatchKernelMeanAverager),
+    (averages.BartlettAverager, averages.BatchBartlettAverager),
+]
+
+
+@pytest.mark.parametrize("scalarcls, batchcls", SCALAR_BATCH_PAIRS)
+@pytest.mark.parametrize("ninitial", [0, 3, 30, 40])
+def test_batch_matches_scalar(scalarcls, batchcls, ninitial):
+    """Batched averagers give exactly the same numbers as one scalar averager per series"""
+    rng = np.random.RandomState(0)
+    initial = rng.normal(20, 5, size=(50, ninitial))
+    data = rng.normal(20, 5, size=(50, 45))
+
+    scalars = [scalarcls(list(initial[ii]), 30) for ii in range(initial.shape[0])]
+    batch = batchcls(initial, 30)
+
+    for tt in range(data.shape[1]):
+        for ii, scalar in enumerate(scalars):
+            scalar.update(data[ii, tt])
+        batch.update(data[:, tt])
+
+        if averages.jit.available() or not issubclass(scalarcls, averages.KernelAverager):
+            npt.assert_array_equal(batch.get(), [scalar.get() for scalar in scalars])
+        else: # KernelAverager falls back on np.dot
+            npt.assert_allclose(batch.get(), [scalar.get() for scalar in scalars], rtol=1e-14)
+
+
+@pytest.mark.parametrize("resync", [None, 1, 7, 1000])
+def test_incrementalmean_matches_mean(resync):
+    """IncrementalMeanAverager tracks MeanAverager through warm-up and many window cycles"""
+    rng = np.random.RandomState(1)
+    data = 1e6 + rng.normal(size=500)
+
+    expected = averages.MeanAverager([1e6, 1e6 + 1], 30)
+    actual = averages.IncrementalMeanAverager([1e6, 1e6 + 1], 30, resync=resync)
+    for datum in data:
+        expected.update(datum)
+        actual.update(datum)
+        npt.assert_allclose(actual.get(), expected.get(), rtol=1e-12)
+
+
+def test_incrementalmean_recovers_from_nan():
+    """A NaN only affects IncrementalMeanAverager while it is in the window"""
+    avg = averages.IncrementalMeanAverager([0., 1., 2.], 3, resync=1000)
+    avg.update(np.nan)
+    assert np.isnan(avg.get())
+    for datum in [3., 4., 5.]:
+        avg.update(datum)
+    assert avg.get() == 4.
+
+
+@pytest.mark.parametrize("length", [1, 4, 5])
+def test_median_bitidentical(length):
+    """MedianAverager reproduces np.median exactly, including ties, NaNs and the partial window"""
+    rng = np.random.RandomState(2)
+    data = rng.randint(0, 4, size=60) + rng.normal(size=60).round(1)
+    data[[20, 41]] = np.nan
+
+    window = [0.5, -1.]
+    avg = averages.MedianAverager(window, length)
+    window = window[-length:]
+    assert avg.get() == np.median(window)
+    for datum in data:
+        avg.update(datum)
+        window = (window + [datum])[-length:]
+        npt.assert_array_equal(avg.get(), np.median(window))
+
+
+def loop_translate(cls, length, data):
+    """Reference translate, updating one averager per series"""
+    result = []
+    for series in data:
+        avg = cls([], length)
+        row = []
+        for datum in series:
+            avg.update(datum)
+            row.append(avg.get())
+        result.append(row)
+    return np.array(result)
+
+
+@pytest.mark.parametrize("cls", [
+    averages.MeanAverager,
+    averages.IncrementalMeanAverager,
+    averages.MedianAverager,
+    averages.BucketAverager,
+    averages.KernelMeanAverager,
+    averages.BartlettAverager,
+])
+@pytest.mark.parametrize("length", [1, 5, 30])
+@pytest.mark.parametrize("bad", [None, np.nan, np.inf])
+def test_translate_matches_loop(cls, length, bad):
+    """Vectorized translate gives the update/get loop's results for 1-D and 2-D inputs,
+    including after a non-finite value leaves the window"""
+    rng = np.random.RandomState(3)
+    data = rng.normal(size=(4, 20))
+    if bad is not None:
+        data[:, 3] = bad
+    expected = loop_translate(cls, length, data)
+
+    actual = averages.translate(cls, length, data)
+    assert actual.shape == data.shape
+    npt.assert_allclose(actual, expected, rtol=1e-12, atol=1e-14)
+
+    actual = averages.translate(cls, length, list(data[0]))
+    assert isinstance(actual, list)
+    npt.assert_allclose(actual, expected[0], rtol=1e-12, atol=1e-14)
+
+
+def test_translate_kernel():
+    """translate passes its length through to KernelAverager as the kernel"""
+    data = np.arange(10.)
+    expected = loop_translate(averages.KernelAverager, [3., 1., 1.], data[None])[0]
+    npt.assert_allclose(averages.translate(averages.KernelAverager, [3., 1., 1.], data), expected)
+
+
+@pytest.mark.parametrize("cls", [averages.MeanAverager, averages.MedianAverager, averages.BucketAverager,
+                                 averages.KernelMeanAverager, averages.BartlettAverager])
+@pytest.mark.parametrize("length", [6, 30])
+def test_translate_exact(cls, length):
+    """Translations reproduce the loop bit for bit"""
+    data = np.random.RandomState(4).normal(20, 5, size=(3, 70))
+    if not averages.jit.available() and issubclass(cls, averages.KernelAverager):
+        pytest.skip("Without numba, KernelAverager.get uses np.dot")
+    npt.assert_array_equal(averages.translate(cls, length, data), loop_translate(cls, length, data))
+
+
+def test_kernel_weights_shared():
+    """Kernel averagers with the same kernel share one read-only set of weights"""
+    one = averages.BartlettAverager([], 30)
+    two = averages.BatchBartlettAverager(np.zeros((2, 0)), 30)
+    assert one.ringweights is two.ringweights
+    assert one.kernel is two.kernel
+    assert not one.kernel.flags.writeable
+    assert averages.KernelMeanAverager([], 30).kernel is not one.kernel
+
+
+@pytest.mark.parametrize("cls", [
+    averages.MeanAverager,
+    averages.IncrementalMeanAverager,
+    averages.MedianAverager,
+    averages.BucketAverager,
+    averages.BartlettAverager,
+])
+def test_no_instance_dict(cls):
+    """Averagers use __slots__ rather than a per-instance __dict__"""
+    assert not hasattr(cls([0.], 3), '__dict__')
+
+
+def test_averagerpool():
+    """Averagers created by a pool keep their buffers in its rows"""
+    pool = averages.AveragerPool(2, 3)
+    one = pool.create(averages.MeanAverager, [1., 2.], 3)
+    two = pool.create(averages.BartlettAverager, [4., 5., 6.], 3)
+    one.update(3.)
+    two.update(7.)
+
+    npt.assert_array_equal(pool.values, [[1., 2., 3.], [7., 5., 6.]])
+    assert one.get() == 2.
+    assert two.get() == averages.BartlettAverager([4., 5., 6., 7.], 3).get()
+
+    with pytest.raises(ValueError):
+        pool.create(averages.MeanAverager, [], 3)
+
+
+def test_save_load_averagers(tmpdir):
+    """Restored averagers continue exactly where the saved ones left off"""
+    pool = averages.AveragerPool(2, 4)
+    originals = [
+        averages.MeanAverager([1., 2.], 4),
+        averages.IncrementalMeanAverager([1., 2., 3., 4., 5.], 4),
+        averages.MedianAverager([np.nan, 2., 3.], 4),
+        averages.BucketAverager([1., 2.], 3),
+        averages.KernelAverager([1., 2.], [3., 1., 1.]),
+        pool.create(averages.BartlettAverager, [1., 2., 3., 4., 5.], 4),
+        pool.create(averages.MeanAverager, [], 4),
+        averages.BatchBartlettAverager(np.ones((3, 2)), 4),
+        averages.BatchBucketAverager(np.ones((3, 2)), 4),
+    ]
+    for avg in originals[:-2]:
+        avg.update(6.)
+
+    path = str(tmpdir.join("averagers.npz"))
+    averages.save_averagers(path, originals)
+    restored = averages.load_averagers(path)
+
+    assert [type(avg) for avg in restored] == [type(avg) for avg in originals]
+    assert restored[5].ringweights is originals[5].ringweights
+    for tt in range(6):
+        for avg in originals[:-2] + restored[:-2]:
+            avg.update(float(tt))
+        for avg in originals[-2:] + restored[-2:]:
+            avg.update(np.arange(3.) + tt)
+        for original, avg in zip(originals, restored):
+            npt.assert_array_equal(avg.get(), original.get())
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_kernels_match_classes(compiled):
+    """The averager kernels, compiled or as their pure-Python fallbacks, reproduce the classes"""
+    def kernel(func):
+        return func if compiled else getattr(func, 'py_func', func)
+
+    bartlett = averages.BartlettAverager([], 4)
+    mean = averages.MeanAverager([], 4)
+    median = averages.MedianAverager([], 4)
+    bucket = averages.BucketAverager([], 4)
+
+    values = np.zeros(4)
+    curlen, write_index = 0, -1
+    sumval, bucketlen = 0., 0
+    for datum in np.random.RandomState(5).normal(size=10):
+        for avg in (bartlett, mean, median, bucket):
+            avg.update(datum)
+        curlen, write_index = kernel(averages.memory_update)(values, curlen, write_index, datum)
+        sumval, bucketlen = kernel(averages.bucket_update)(sumval, bucketlen, 4, datum)
+
+        npt.assert_allclose(kernel(averages.kernel_get)(bartlett.fillweights, bartlett.ringweights, values, curlen, write_index), bartlett.get())
+        npt.assert_allclose(kernel(averages.mean_get)(values, curlen), mean.get())
+        assert kernel(averages.median_get)(values, curlen) == median.get()
+        assert sumval / bucketlen == bucket.get()
+
+
+def test_kernel_get_matches_class():
+    """KernelAverager.get matches the kernel_get kernel, compiled or not"""
+    avg = averages.BartlettAverager([], 5)
+    for datum in np.random.RandomState(6).normal(size=12):
+        avg.update(datum)
+        write_index = -1 if avg.write_index is None else avg.write_index
+        for kernel in (averages.kernel_get, getattr(averages.kernel_get, 'py_func', averages.kernel_get)):
+            npt.assert_allclose(avg.get(), kernel(avg.fillweights, avg.ringweights, avg.values, avg.curlen,
+                                                  write_index), rtol=1e-12)
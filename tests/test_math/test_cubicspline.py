@@ -0,0 +1,66 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+from impactcommon.math import cubicspline, minmaxspline
+
+KNOTS = [-12, -7, 0, 10, 18, 23, 28, 33]
+
+
+def basis_spline(knots, coeffs, xx):
+    """The restricted cubic spline, written out with NumPy"""
+    knots = np.array(knots, dtype=float)
+    total = coeffs[0] * xx
+    for kk in range(len(knots) - 2):
+        total = total + coeffs[kk+1] * (np.maximum(0, xx - knots[kk])**3
+                                        - np.maximum(0, xx - knots[-2])**3 * (knots[-1] - knots[kk]) / (knots[-1] - knots[-2])
+                                        + np.maximum(0, xx - knots[-1])**3 * (knots[-2] - knots[kk]) / (knots[-1] - knots[-2]))
+    return total
+
+
+def test_spline():
+    """The spline matches its basis, for arrays and single points"""
+    coeffs = np.random.RandomState(0).normal(scale=1e-3, size=len(KNOTS) - 1)
+    xx = np.linspace(-20, 40, 601)
+
+    npt.assert_allclose(cubicspline.spline(KNOTS, coeffs, xx), basis_spline(KNOTS, coeffs, xx), rtol=1e-12, atol=1e-12)
+    npt.assert_allclose(cubicspline.spline(KNOTS, coeffs, 25.), basis_spline(KNOTS, coeffs, 25.), rtol=1e-12)
+    assert np.shape(cubicspline.spline(KNOTS, coeffs, xx[:600].reshape(3, -1))) == (3, 200)
+
+
+def test_derivative():
+    """The derivative matches finite differences of the spline"""
+    coeffs = np.random.RandomState(1).normal(scale=1e-3, size=len(KNOTS) - 1)
+    xx = np.linspace(-20, 40, 601)
+
+    step = 1e-5
+    expected = (basis_spline(KNOTS, coeffs, xx + step) - basis_spline(KNOTS, coeffs, xx - step)) / (2 * step)
+    npt.assert_allclose(cubicspline.derivative(KNOTS, coeffs, xx), expected, rtol=1e-6, atol=1e-8)
+
+
+def test_evaluate_splines():
+    """Evaluating many splines matches evaluating each, compiled or not"""
+    coeffs = np.random.RandomState(2).normal(scale=1e-3, size=(10, len(KNOTS) - 1))
+    xx = np.random.RandomState(3).uniform(-20, 40, size=(10, 5))
+    knots = np.array(KNOTS, dtype=float)
+
+    expected = np.array([cubicspline.spline(KNOTS, coeffs[ii], xx[ii]) for ii in range(10)])
+    for evaluate in [cubicspline.evaluate_splines, cubicspline.evaluate_splines.py_func]:
+        values = np.empty(xx.shape)
+        evaluate(knots, coeffs, xx, values)
+        npt.assert_array_equal(values, expected)
+
+
+def test_matches_openest():
+    """spline matches openest's CubicSplineCurve, and findsplinemin finds its minimum"""
+    curve = pytest.importorskip("openest.models.curve")
+
+    xx = np.linspace(-20, 40, 601)
+    grid = np.linspace(-10, 35, 4501)
+    for seed in range(5):
+        coeffs = np.random.RandomState(seed).normal(scale=1e-3, size=len(KNOTS) - 1)
+        openest_spline = curve.CubicSplineCurve(KNOTS, coeffs)
+        npt.assert_allclose(cubicspline.spline(KNOTS, coeffs, xx), openest_spline(xx), rtol=1e-12, atol=1e-12)
+
+        minx = minmaxspline.findsplinemin(KNOTS, coeffs, -10, 35)
+        assert -10 <= minx <= 35
+        assert openest_spline(minx) <= np.min(openest_spline(grid)) + 1e-12
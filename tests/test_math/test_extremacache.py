@@ -0,0 +1,50 @@
+import numpy as np
+import numpy.testing as npt
+from impactcommon.math.extremacache import ExtremumCache
+from impactcommon.math.minpoly import findpolymin
+
+
+def test_extremumcache():
+    """Repeated calls are served from the cache, with the same results"""
+    cached = ExtremumCache(findpolymin)
+    coeffs = [0, 0, -3, 1, 2]
+
+    for minx, maxx in [(-np.inf, np.inf), (0, np.inf), (-np.inf, np.inf), (0, np.inf)]:
+        npt.assert_allclose(cached(coeffs, minx, maxx), findpolymin(coeffs, minx, maxx))
+    npt.assert_allclose(cached(np.array(coeffs, dtype=float), 0, np.inf), findpolymin(coeffs, 0, np.inf))
+
+    assert cached.stats() == dict(hits=3, misses=2, hitrate=0.6, size=2, maxsize=1024)
+    cached.clear()
+    assert cached.stats()['size'] == 0 and cached.hits == 0
+
+
+def test_extremumcache_tolerance():
+    """Coefficients within the rounding tolerance share an entry"""
+    calls = []
+    def solver(knots, coeffs, minx, maxx):
+        calls.append(coeffs)
+        return len(calls)
+
+    exact = ExtremumCache(solver)
+    assert exact([0, 1], [1.0, 2.0], 0, 1) == 1
+    assert exact([0, 1], [1.0, 2.0 + 1e-14], 0, 1) == 2
+
+    rounded = ExtremumCache(solver, tolerance=1e-10)
+    assert rounded([0, 1], [1.0, 2.0], 0, 1) == 3
+    assert rounded([0, 1], [1.0, 2.0 + 1e-14], 0, 1) == 3
+    assert rounded([0, 1], [1.0, 2.0], 0, 2) == 4
+    assert rounded.hits == 1 and rounded.misses == 2
+
+
+def test_extremumcache_lru():
+    """The least recently used entry is dropped when the cache is full"""
+    cached = ExtremumCache(lambda coeffs: coeffs[0], maxsize=2)
+    cached([1.0])
+    cached([2.0])
+    cached([1.0])
+    cached([3.0]) # drops [2.0]
+
+    assert cached.stats()['size'] == 2
+    cached([1.0])
+    cached([2.0])
+    assert cached.hits == 2 and cached.misses == 4
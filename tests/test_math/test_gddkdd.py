@@ -0,0 +1,203 @@
+import warnings
+import numpy as np
+import numpy.testing as npt
+import pandas as pd
+import pytest
+from impactcommon.math import gddkdd
+
+
+@pytest.fixture
+def temps():
+    """Daily minimum and maximum temperatures, shaped (day, lat, lon)"""
+    rng = np.random.RandomState(0)
+    mins = rng.uniform(-10, 30, size=(365, 3, 4))
+    maxs = mins + rng.uniform(0, 15, size=mins.shape)
+    return mins, maxs
+
+
+def test_above_threshold_always_above():
+    """Days entirely above the threshold contribute their mean less the threshold"""
+    mins = np.array([20., 22.])
+    maxs = np.array([30., 24.])
+    npt.assert_allclose(gddkdd.above_threshold(mins, maxs, 10.), 15. + 13.)
+    assert gddkdd.above_threshold(mins, maxs, 40.) == 0
+
+
+@pytest.mark.parametrize("axis", [None, 0, (0, 2)])
+def test_above_thresholds_matches_single(temps, axis):
+    """above_thresholds matches above_threshold applied to each threshold"""
+    mins, maxs = temps
+    thresholds = np.arange(-5., 40.)
+    actual = gddkdd.above_thresholds(mins, maxs, thresholds, axis=axis)
+
+    for ii, threshold in enumerate(thresholds):
+        if axis is None:
+            expected = gddkdd.above_threshold(mins, maxs, threshold)
+        else:
+            expected = np.array([[gddkdd.above_threshold(mins[:, jj, kk], maxs[:, jj, kk], threshold)
+                                  for kk in range(mins.shape[2])] for jj in range(mins.shape[1])])
+            if axis == (0, 2):
+                expected = expected.sum(axis=1)
+        npt.assert_allclose(actual[ii], expected, rtol=1e-10)
+
+
+def test_get_gddkdd(temps):
+    """GDD and KDD split the degree-days above gdd_start at kdd_start"""
+    mins, maxs = temps
+    gdd, kdd = gddkdd.get_gddkdd(mins, maxs, 8., 29.)
+    npt.assert_allclose(gdd + kdd, gddkdd.above_threshold(mins, maxs, 8.))
+    npt.assert_allclose(kdd, gddkdd.above_threshold(mins, maxs, 29.))
+
+
+def test_get_gddkdd_by_year(temps, tmpdir):
+    """Annual GDD and KDD from memory-mapped and xarray inputs match get_gddkdd per year and cell"""
+    xr = pytest.importorskip("xarray")
+    mins, maxs = temps
+    mins = np.concatenate([mins, mins[::-1]])
+    maxs = np.concatenate([maxs, maxs[::-1]])
+    years = np.repeat([2001, 2002], 365)
+
+    expected_gdd = np.empty((2,) + mins.shape[1:])
+    expected_kdd = np.empty((2,) + mins.shape[1:])
+    for yy in range(2):
+        for jj in range(mins.shape[1]):
+            for kk in range(mins.shape[2]):
+                days = slice(365 * yy, 365 * (yy + 1))
+                expected_gdd[yy, jj, kk], expected_kdd[yy, jj, kk] = gddkdd.get_gddkdd(
+                    mins[days, jj, kk], maxs[days, jj, kk], 8., 29.)
+
+    mapped_mins = np.memmap(str(tmpdir.join("mins.dat")), dtype=np.float64, mode='w+', shape=mins.shape)
+    mapped_mins[:] = mins
+    actual = gddkdd.get_gddkdd_by_year(mapped_mins, maxs, 8., 29., years=years, spacechunk=2, workers=2)
+    npt.assert_array_equal(actual[0], [2001, 2002])
+    npt.assert_allclose(actual[1], expected_gdd)
+    npt.assert_allclose(actual[2], expected_kdd)
+
+    time = pd.date_range('2001-01-01', periods=730, freq='D')
+    actual = gddkdd.get_gddkdd_by_year(xr.DataArray(mins, dims=('time', 'lat', 'lon'), coords={'time': time}),
+                                       xr.DataArray(maxs, dims=('time', 'lat', 'lon'), coords={'time': time}),
+                                       8., 29.)
+    npt.assert_array_equal(actual[0], [2001, 2002])
+    npt.assert_allclose(actual[1], expected_gdd)
+    npt.assert_allclose(actual[2], expected_kdd)
+
+
+@pytest.mark.parametrize("kernel", ['sum_above_thresholds', 'sum_above_thresholds_table',
+                                    'sum_seasonal_above_thresholds'])
+def test_kernels_release_gil(kernel):
+    """The summing kernels release the GIL, so get_gddkdd_by_year's threads run in parallel"""
+    pytest.importorskip("numba")
+    dispatcher = getattr(gddkdd, kernel)
+    assert getattr(dispatcher, 'dispatcher', dispatcher).targetoptions['nogil']
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_nan_and_flat_days(monkeypatch, compiled):
+    """NaN days give NaN degree-days; days with mins == maxs count whole or not at all, without warnings"""
+    if not compiled:
+        monkeypatch.setattr(gddkdd.jit, '_available', False)
+
+    mins = np.array([[10., 20.], [np.nan, 20.], [30., 25.]])
+    maxs = np.array([[10., 20.], [15., 20.], [30., 25.]])
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        actual = gddkdd.above_thresholds(mins, maxs, [12., 35.], axis=0)
+
+    npt.assert_array_equal(actual, [[np.nan, 8. + 8. + 13.], [np.nan, 0.]])
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_get_gddkdd_scalars(monkeypatch, compiled):
+    """Single days, given as scalars, give the same degree-days with or without numba"""
+    if not compiled:
+        monkeypatch.setattr(gddkdd.jit, '_available', False)
+
+    for mn, mx in [(0., 10.), (10., 20.), (30., 35.), (5., 5.)]:
+        expected = gddkdd.get_gddkdd(np.array([mn]), np.array([mx]), 8., 29.)
+        npt.assert_allclose(gddkdd.get_gddkdd(mn, mx, 8., 29.), expected, rtol=1e-12)
+        assert np.ndim(gddkdd.above_threshold(mn, mx, 8.)) == 0
+
+
+def test_numpy_matches_compiled(temps, monkeypatch):
+    """The NumPy implementation, used without numba, matches the compiled kernel"""
+    mins, maxs = temps
+    thresholds = np.arange(-5., 40.)
+    compiled = gddkdd.above_thresholds(mins, maxs, thresholds, axis=(0, 2))
+    monkeypatch.setattr(gddkdd.jit, '_available', False)
+    npt.assert_allclose(gddkdd.above_thresholds(mins, maxs, thresholds, axis=(0, 2)), compiled, rtol=1e-10)
+
+
+@pytest.mark.parametrize("tolerance", [1e-2, 1e-4, 1e-6])
+def test_table_within_tolerance(temps, tolerance):
+    """Interpolated degree-days are within tolerance times each day's half-range of the exact ones"""
+    mins, maxs = temps
+    bound = tolerance * np.sum((maxs - mins) / 2, axis=0)
+    for threshold in [0., 10., 25.]:
+        exact = gddkdd.above_thresholds(mins, maxs, [threshold], axis=0)[0]
+        approx = gddkdd.above_thresholds(mins, maxs, [threshold], axis=0, tolerance=tolerance)[0]
+        assert np.all(np.abs(approx - exact) <= bound)
+
+    gdd, kdd = gddkdd.get_gddkdd(mins, maxs, 8., 29., tolerance=tolerance)
+    npt.assert_allclose((gdd, kdd), gddkdd.get_gddkdd(mins, maxs, 8., 29.), atol=2 * tolerance * np.sum(maxs - mins))
+
+
+def test_integral_table():
+    """The integral table runs from a full day above the threshold to none"""
+    table = gddkdd.get_integral_table(1e-6)
+    assert table[0] == 1 and abs(table[-1]) < 1e-15
+    assert gddkdd.get_integral_table(1e-6) is table
+
+
+@pytest.mark.parametrize("compiled", [True, False])
+def test_get_gddkdd_by_season(temps, monkeypatch, compiled):
+    """Seasonal GDD and KDD match get_gddkdd over each region's season, with seasons across the new year
+    counted in the year they end"""
+    if not compiled:
+        monkeypatch.setattr(gddkdd.jit, '_available', False)
+
+    mins, maxs = temps
+    mins = np.concatenate([mins, mins[::-1]]).reshape(730, -1)
+    maxs = np.concatenate([maxs, maxs[::-1]]).reshape(730, -1)
+    years = np.repeat([2001, 2002], 365)
+    season_start = np.array([100, 1, 300] * 4)
+    season_end = np.array([250, 365, 60] * 4)
+
+    expected = np.empty((2, 2, mins.shape[1]))
+    for yy in range(2):
+        for jj in range(mins.shape[1]):
+            days = np.arange(1, 731) - 365 * (np.arange(730) >= 365)
+            if season_start[jj] <= season_end[jj]:
+                inseason = (years == 2001 + yy) & (days >= season_start[jj]) & (days <= season_end[jj])
+            else:
+                inseason = (((years == 2001 + yy) & (days <= season_end[jj])) |
+                            ((years == 2000 + yy) & (days >= season_start[jj])))
+            expected[:, yy, jj] = gddkdd.get_gddkdd(mins[inseason, jj], maxs[inseason, jj], 8., 29.)
+
+    actual = gddkdd.get_gddkdd_by_season(mins, maxs, 8., 29., years, season_start=season_start, season_end=season_end)
+    npt.assert_array_equal(actual[0], [2001, 2002])
+    npt.assert_allclose(actual[1:], expected, rtol=1e-10)
+
+    mask = np.tile(np.arange(1, 366), 2)[:, None] >= season_start
+    expected = gddkdd.get_gddkdd_by_season(mins, maxs, 8., 29., years, season_start=season_start, season_end=365)
+    npt.assert_allclose(gddkdd.get_gddkdd_by_season(mins, maxs, 8., 29., years, mask=mask)[1:], expected[1:])
+
+    seasonyears = np.tile(years[:, None], (1, mins.shape[1]))
+    seasonyears[:, 2] = 2001 # the whole third region counted in one year
+    actual = gddkdd.get_gddkdd_by_season(mins, maxs, 8., 29., years, mask=np.ones(mins.shape, dtype=bool),
+                                         seasonyears=seasonyears)
+    gdd, kdd = gddkdd.get_gddkdd(mins[:, 2], maxs[:, 2], 8., 29.)
+    npt.assert_allclose(actual[1][:, 2], [gdd, 0.])
+    npt.assert_allclose(actual[2][:, 2], [kdd, 0.])
+
+
+def test_get_gddkdd_by_season_partial_year():
+    """Default days of year would be wrong for a first year that does not start on January 1"""
+    mins = np.zeros((400, 2))
+    years = np.repeat([2001, 2002], [35, 365])
+    with pytest.raises(ValueError):
+        gddkdd.get_gddkdd_by_season(mins, mins + 10, 8., 29., years, season_start=100, season_end=200)
+
+    dayofyears = np.append(np.arange(331, 366), np.arange(1, 366))
+    actual = gddkdd.get_gddkdd_by_season(mins, mins + 10, 8., 29., years, season_start=100, season_end=200,
+                                         dayofyears=dayofyears)
+    npt.assert_array_equal(actual[0], [2001, 2002])
+    npt.assert_allclose(actual[1], [[0., 0.], [101 * gddkdd.get_gddkdd(0., 10., 8., 29.)[0]] * 2])
@@ -0,0 +1,24 @@
+import os
+import subprocess
+import sys
+import impactcommon
+from impactcommon.math import jit
+
+
+def test_import_is_lazy():
+    """Importing the averages does not import numba until a kernel is called"""
+    script = "import sys, impactcommon.math.averages; assert 'numba' not in sys.modules"
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(impactcommon.__file__)))
+    subprocess.check_call([sys.executable, '-c', script], env=env)
+
+
+def test_lazydispatcher():
+    """A lazy kernel gives the Python function's results, and compiles its declared signatures"""
+    def add(aa, bb):
+        return aa + bb
+
+    dispatcher = jit.njit('float64(float64, float64)')(add)
+    assert dispatcher in jit.registry
+    assert dispatcher(1., 2.) == 3.
+    dispatcher.compile()
+    assert dispatcher.py_func is add
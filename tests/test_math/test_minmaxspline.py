@@ -1,6 +1,19 @@
 import numpy as np
 import numpy.testing as npt
-from impactcommon.math.minmaxspline import findextremes, findsplinemin, findsplinemax
+import pytest
+from impactcommon.math.minmaxspline import findextremes, findsplinemin, findsplinemax, findsplinemin_many, findsplinemax_many
+
+
+KNOTS = [-12, -7, 0, 10, 18, 23, 28, 33]
+COEFFS = [
+    -0.088404222535054311,
+    0.00044585141069226897,
+    -0.0013680191382785048,
+    0.0015570001425749581,
+    -0.00014956629970445078,
+    -0.0036869690281538109,
+    0.011688014471165964,
+]
 
 
 def test_findextremes():
@@ -66,3 +79,20 @@ def test_findsplinemax():
     )
 
     npt.assert_allclose([actual], [expected])
+
+
+@pytest.mark.parametrize("minx,maxx", [(10, 25), (0, 32), (-20, 40), (-50, 50), (-np.inf, np.inf)])
+def test_findspline_many(minx, maxx):
+    """Batched findsplinemin and findsplinemax match the scalar versions on each row, including beyond the knots"""
+    coeffs = np.array(COEFFS) * (1 + np.random.RandomState(4).normal(scale=0.5, size=(2000, len(COEFFS))))
+
+    expected = [findsplinemin(KNOTS, row, minx, maxx) for row in coeffs]
+    npt.assert_array_equal(findsplinemin_many(KNOTS, coeffs, minx, maxx), expected)
+
+    expected = [findsplinemax(KNOTS, row, minx, maxx) for row in coeffs]
+    npt.assert_array_equal(findsplinemax_many(KNOTS, coeffs, minx, maxx), expected)
+
+
+def test_findsplinemin_many_single():
+    """Batched findsplinemin on a single row gives the known minimum"""
+    npt.assert_allclose(findsplinemin_many(KNOTS, [COEFFS], 10, 25), [16.985656534045365])
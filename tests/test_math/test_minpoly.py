@@ -0,0 +1,52 @@
+import numpy as np
+import numpy.testing as npt
+import pytest
+from impactcommon.math.minpoly import findpolymin, findpolymin_many, polyroots, cubicroots
+
+
+def test_findpolymin():
+    """Simple test of findpolymin output, over different bounds"""
+    npt.assert_allclose(findpolymin([0, 0, -3, 1, 2], -np.inf, np.inf), -1.0735904299223642)
+    npt.assert_allclose(findpolymin([0, 0, -3, 1, 2], 0, np.inf), 0.698590429922364)
+    npt.assert_allclose(findpolymin([0, 0, -3, 1, 2], -1, 1), -1)
+
+
+@pytest.mark.parametrize("order", [2, 3, 4, 5])
+@pytest.mark.parametrize("minx,maxx", [(-np.inf, np.inf), (0, np.inf), (-1, 1), (-10, 30)])
+def test_findpolymin_many(order, minx, maxx):
+    """Batched findpolymin matches findpolymin on each row, including rows of lower order"""
+    coeffs = np.random.RandomState(order).normal(size=(500, order + 1))
+    coeffs[:20, -1] = 0
+
+    expected = [findpolymin(list(row), minx, maxx) for row in coeffs]
+    npt.assert_allclose(findpolymin_many(coeffs, minx, maxx), expected, rtol=1e-7, atol=1e-9)
+
+
+def test_findpolymin_many_responses():
+    """Batched findpolymin on quartic temperature responses"""
+    coeffs = np.array([0, -0.01, 0.003, -1e-4, 1e-6]) * (1 + np.random.RandomState(0).normal(scale=0.3, size=(500, 5)))
+
+    expected = [findpolymin(row, 10, 30) for row in coeffs]
+    npt.assert_allclose(findpolymin_many(coeffs, 10, 30), expected, rtol=1e-10)
+
+
+@pytest.mark.parametrize("coeffs,minx,maxx,expected", [([0, 0, -2, 0, 1], -np.inf, np.inf, -1.),
+                                                       ([-2, 2, -3, 0, 1], 0, np.inf, 0.),
+                                                       ([0, 0, -2, 0, 1], -1, 1, -1.)])
+def test_findpolymin_many_ties(coeffs, minx, maxx, expected):
+    """Batched findpolymin breaks ties between equal minima as findpolymin does, e.g. for symmetric quartics"""
+    assert findpolymin(coeffs, minx, maxx) == expected
+    minima = findpolymin_many([coeffs, [0, 0, -3, 1, 2]], minx, maxx)
+    assert minima[0] == expected
+    npt.assert_allclose(minima[1], findpolymin([0, 0, -3, 1, 2], minx, maxx), rtol=1e-12)
+
+
+def test_cubicroots():
+    """Closed-form cubic roots agree with the companion-matrix roots"""
+    coeffs = np.random.RandomState(0).normal(size=(1000, 4))
+    roots, valids = cubicroots(coeffs)
+    expected, expected_valids = polyroots(coeffs)
+
+    npt.assert_array_equal(valids.sum(axis=1), expected_valids.sum(axis=1))
+    npt.assert_allclose(np.sort(np.where(valids, roots, np.inf), axis=1),
+                        np.sort(np.where(expected_valids, expected, np.inf), axis=1), rtol=1e-8, atol=1e-10)